@@ -0,0 +1,203 @@
+"""Response compression negotiated through ``Accept-Encoding``.
+
+``CompressionMiddleware`` gzip- or deflate-compresses complete response bodies
+above a minimum size. Collection endpoints can additionally mark their
+response as cacheable under the collection's write version (see
+``cache_by_version``); the compressed body is then kept in a bounded LRU
+cache so repeated requests for unchanged data skip recompression.
+"""
+
+import gzip
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from fastapi import Request
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.config import COMPRESSION_CACHE_BYTES, COMPRESSION_LEVEL, COMPRESSION_MIN_SIZE
+
+ENCODINGS = ("gzip", "deflate")
+
+# Bodies larger than this are compressed in the threadpool instead of on the event loop.
+_THREADPOOL_THRESHOLD = 64 * 1024
+_CACHE_KEY = "compression.cache_key"
+
+
+def compress(body: bytes, encoding: str, level: int = COMPRESSION_LEVEL) -> bytes:
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=level, mtime=0)
+    return zlib.compress(body, level)
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """Pick the best supported encoding from an ``Accept-Encoding`` header."""
+    weights: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            weights[name] = q
+    best, best_q = None, 0.0
+    for encoding in ENCODINGS:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def _encoded_etag(etag: str, encoding: str) -> str:
+    """Suffix an ETag with the encoding so it differs from the identity representation's."""
+    if etag.endswith('"'):
+        return f'{etag[:-1]}-{encoding}"'
+    return etag
+
+
+class CompressedBodyCache:
+    """LRU of compressed bodies bounded by their total size in bytes."""
+
+    def __init__(self, max_bytes: int = COMPRESSION_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key: tuple, body: bytes):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._entries[key] = body
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = self.hits = self.misses = 0
+
+
+cache = CompressedBodyCache()
+
+
+def mark_cacheable(request: Request, version: int):
+    """Let the compressed response for this request be reused until ``version`` changes.
+
+    Call this before reading the data so a concurrent write can only make the
+    cached body newer than its version, never older.
+    """
+    request.scope[_CACHE_KEY] = (request.url.path, request.url.query, version)
+
+
+def cache_by_version(source) -> Callable[[Request], None]:
+    """Dependency that marks a collection response cacheable under ``source.version``."""
+
+    def dependency(request: Request):
+        mark_cacheable(request, source.version)
+
+    return dependency
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app,
+        minimum_size: int = COMPRESSION_MIN_SIZE,
+        level: int = COMPRESSION_LEVEL,
+        body_cache: Optional[CompressedBodyCache] = None,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+        self.cache = body_cache if body_cache is not None else cache
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=start_message["headers"])
+            body = message.get("body", b"")
+            if (
+                message.get("more_body", False)
+                or start_message["status"] == 206
+                or "content-range" in headers
+                or "content-encoding" in headers
+                or len(body) < self.minimum_size
+            ):
+                # Streamed, a byte range of the identity body, already encoded
+                # or too small: send untouched.
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = await self._compress(scope, start_message["status"], body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            if "etag" in headers:
+                headers["ETag"] = _encoded_etag(headers["etag"], encoding)
+            headers.add_vary_header("Accept-Encoding")
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
+
+    async def _compress(self, scope, status_code: int, body: bytes, encoding: str) -> bytes:
+        key = scope.get(_CACHE_KEY) if status_code == 200 else None
+        if key is not None:
+            key = (*key, encoding, self.level)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        if len(body) >= _THREADPOOL_THRESHOLD:
+            compressed = await run_in_threadpool(compress, body, encoding, self.level)
+        else:
+            compressed = compress(body, encoding, self.level)
+        if key is not None:
+            self.cache.put(key, compressed)
+        return compressed
@@ -0,0 +1,31 @@
+"""Runtime configuration read from environment variables."""
+
+import os
+
+# Number of independently locked partitions the enrollment data is split into.
+ENROLLMENT_SHARDS: int = int(os.environ.get("ENROLLMENT_SHARDS", "16"))
+
+# Background report generation.
+REPORT_WORKERS: int = int(os.environ.get("REPORT_WORKERS", str(min(4, os.cpu_count() or 1))))
+REPORT_MAX_CONCURRENT_JOBS: int = int(os.environ.get("REPORT_MAX_CONCURRENT_JOBS", "2"))
+REPORT_MAX_PENDING_JOBS: int = int(os.environ.get("REPORT_MAX_PENDING_JOBS", "32"))
+REPORT_RESULT_TTL: float = float(os.environ.get("REPORT_RESULT_TTL", "600"))
+REPORT_CHUNK_SIZE: int = int(os.environ.get("REPORT_CHUNK_SIZE", "5000"))
+# Where finished reports are written; unset uses a private temporary directory,
+# or ``<STORE_PATH>-reports`` when the store is shared between workers.
+REPORT_RESULT_DIR: str = os.environ.get("REPORT_RESULT_DIR", "")
+
+# Response compression.
+COMPRESSION_MIN_SIZE: int = int(os.environ.get("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_LEVEL: int = int(os.environ.get("COMPRESSION_LEVEL", "6"))
+COMPRESSION_CACHE_BYTES: int = int(os.environ.get("COMPRESSION_CACHE_BYTES", str(32 * 1024 * 1024)))
+
+# Opt-in traffic capture for replay load tests; disabled unless a path is set.
+TRAFFIC_CAPTURE_PATH: str = os.environ.get("TRAFFIC_CAPTURE_PATH", "")
+TRAFFIC_CAPTURE_SAMPLE: float = float(os.environ.get("TRAFFIC_CAPTURE_SAMPLE", "1.0"))
+
+# Exercise request handling before the worker reports ready.
+STARTUP_WARMUP: bool = os.environ.get("STARTUP_WARMUP", "1") not in ("0", "false", "no")
+
+# SQLite file shared by all worker processes; unset keeps the in-memory store.
+STORE_PATH: str = os.environ.get("STORE_PATH", "")
@@ -0,0 +1,177 @@
+"""Enrollment storage partitioned into independently locked shards.
+
+Enrollments are routed to a shard by ``course_id``, so every per-course
+operation (enroll, duplicate check, course listing) takes exactly one shard
+lock and writes to different courses proceed in parallel. Each shard owns its
+own id sequence; ids are interleaved across shards (``seq * num_shards +
+index + 1``) so they stay globally unique and the owning shard can be
+recovered from the id alone.
+
+Records and per-course indexes are versioned ``Table``s, so listings iterate
+O(1) point-in-time snapshots instead of live dicts and never block, or trip
+over, concurrent writers.
+"""
+
+import heapq
+import threading
+from contextlib import ExitStack, contextmanager
+from operator import itemgetter
+from typing import Optional
+
+from app.data.tables import Table
+
+_by_id = itemgetter("id")
+
+
+class DuplicateEnrollmentError(ValueError):
+    """Raised when a student is already enrolled in the course."""
+
+
+class EnrollmentShard:
+    """One partition of the enrollment data with its own lock, indexes and counters."""
+
+    def __init__(self, index: int, num_shards: int):
+        self.index = index
+        self.num_shards = num_shards
+        self.lock = threading.RLock()
+        self.records = Table()
+        self.by_course: dict[int, Table] = {}
+        self.by_user: dict[int, dict[int, dict]] = {}
+        self.pairs: set[tuple[int, int]] = set()
+        self.seq = 0
+        self.version = 0
+
+    def next_id(self) -> int:
+        """Allocate the next id owned by this shard. Caller must hold ``lock``."""
+        enrollment_id = self.seq * self.num_shards + self.index + 1
+        self.seq += 1
+        return enrollment_id
+
+
+class ShardedEnrollmentStore:
+    """Enrollment records split across ``num_shards`` shards keyed by course_id."""
+
+    def __init__(self, num_shards: int):
+        self.configure(num_shards)
+
+    def configure(self, num_shards: int):
+        """Replace all shards with ``num_shards`` empty ones."""
+        if num_shards < 1:
+            raise ValueError("num_shards must be at least 1")
+        # Keep ``version`` increasing across reconfiguration so caches keyed on it stay valid.
+        self._base_version = self.version + 1 if hasattr(self, "shards") else 0
+        self.num_shards = num_shards
+        self.shards = [EnrollmentShard(i, num_shards) for i in range(num_shards)]
+
+    def clear(self):
+        self.configure(self.num_shards)
+
+    @property
+    def version(self) -> int:
+        """Write counter for the whole store; increases on every add or remove."""
+        return self._base_version + sum(shard.version for shard in self.shards)
+
+    def course_version(self, course_id: int) -> int:
+        """Write counter that changes whenever the course's enrollments may have changed."""
+        return self._base_version + self.shard_for_course(course_id).version
+
+    def shard_for_course(self, course_id: int) -> EnrollmentShard:
+        return self.shards[course_id % self.num_shards]
+
+    def shard_for_enrollment(self, enrollment_id: int) -> EnrollmentShard:
+        return self.shards[(enrollment_id - 1) % self.num_shards]
+
+    @contextmanager
+    def lock_all(self):
+        """Hold every shard lock, in index order, for a consistent cross-shard read."""
+        with ExitStack() as stack:
+            for shard in self.shards:
+                stack.enter_context(shard.lock)
+            yield
+
+    # ── Single-shard operations ──────────────────────────────────────────────
+
+    def add(self, user_id: int, course_id: int) -> dict:
+        """Create an enrollment, raising DuplicateEnrollmentError if it already exists."""
+        shard = self.shard_for_course(course_id)
+        with shard.lock:
+            if (user_id, course_id) in shard.pairs:
+                raise DuplicateEnrollmentError("Student is already enrolled in this course")
+            enrollment_id = shard.next_id()
+            record = {"id": enrollment_id, "user_id": user_id, "course_id": course_id}
+            shard.records[enrollment_id] = record
+            bucket = shard.by_course.get(course_id)
+            if bucket is None:
+                bucket = shard.by_course[course_id] = Table()
+            bucket[enrollment_id] = record
+            shard.by_user.setdefault(user_id, {})[enrollment_id] = record
+            shard.pairs.add((user_id, course_id))
+            shard.version += 1
+        return record
+
+    def get(self, enrollment_id: int) -> Optional[dict]:
+        if enrollment_id < 1:
+            return None
+        return self.shard_for_enrollment(enrollment_id).records.get(enrollment_id)
+
+    def remove(self, enrollment_id: int) -> Optional[dict]:
+        """Delete an enrollment and return it, or None if it does not exist."""
+        if enrollment_id < 1:
+            return None
+        shard = self.shard_for_enrollment(enrollment_id)
+        with shard.lock:
+            record = shard.records.pop(enrollment_id)
+            if record is None:
+                return None
+            user_id, course_id = record["user_id"], record["course_id"]
+            bucket = shard.by_course[course_id]
+            bucket.pop(enrollment_id)
+            if not bucket:
+                del shard.by_course[course_id]
+            _discard(shard.by_user, user_id, enrollment_id)
+            shard.pairs.discard((user_id, course_id))
+            shard.version += 1
+        return record
+
+    def for_course(self, course_id: int) -> list[dict]:
+        bucket = self.shard_for_course(course_id).by_course.get(course_id)
+        return [] if bucket is None else list(bucket.values())
+
+    # ── Cross-shard operations ───────────────────────────────────────────────
+
+    def for_student(self, user_id: int) -> list[dict]:
+        parts = []
+        for shard in self.shards:
+            with shard.lock:
+                part = shard.by_user.get(user_id)
+                if part:
+                    parts.append(list(part.values()))
+        return _merge(parts)
+
+    def all(self) -> list[dict]:
+        # Holding every lock only while taking the O(1) snapshots gives a
+        # consistent cut across shards; iteration then runs lock-free.
+        with self.lock_all():
+            snapshots = [shard.records.snapshot() for shard in self.shards]
+        return list(heapq.merge(*(snap.values() for snap in snapshots), key=_by_id))
+
+    def __len__(self) -> int:
+        return sum(len(shard.records) for shard in self.shards)
+
+    def __contains__(self, enrollment_id: int) -> bool:
+        return self.get(enrollment_id) is not None
+
+
+def _discard(index: dict[int, dict[int, dict]], key: int, enrollment_id: int):
+    bucket = index.get(key)
+    if bucket is not None:
+        bucket.pop(enrollment_id, None)
+        if not bucket:
+            del index[key]
+
+
+def _merge(parts: list[list[dict]]) -> list[dict]:
+    """Merge per-shard lists (each already in id order) into one id-ordered list."""
+    if len(parts) == 1:
+        return parts[0]
+    return list(heapq.merge(*parts, key=_by_id))
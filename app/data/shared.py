@@ -0,0 +1,321 @@
+"""SQLite-backed store shared by every worker process on a host.
+
+Enabled by setting ``STORE_PATH``. ``SharedTable`` and
+``SharedEnrollmentStore`` expose the same interface as ``Table`` and
+``ShardedEnrollmentStore``, so routers work unchanged against either backend.
+The database runs in WAL mode: readers in any process see a consistent
+snapshot without blocking, while writers serialize on SQLite's file lock.
+Ids come from a ``sequences`` table updated inside the writing transaction,
+so they are unique across processes, and per-collection write versions are
+kept in the database so response caches in every worker invalidate together.
+"""
+
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager, nullcontext
+from typing import Iterator, Optional
+
+from app.data.shards import DuplicateEnrollmentError
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sequences (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS versions (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS users (id INTEGER PRIMARY KEY, data TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS courses (id INTEGER PRIMARY KEY, data TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS enrollments (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    course_id INTEGER NOT NULL,
+    UNIQUE (user_id, course_id)
+);
+CREATE INDEX IF NOT EXISTS enrollments_course ON enrollments (course_id, id);
+CREATE TABLE IF NOT EXISTS report_jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    filename TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL,
+    chunks_done INTEGER NOT NULL DEFAULT 0,
+    chunks_total INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    path TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS report_jobs_inflight ON report_jobs (key) WHERE finished_at IS NULL;
+CREATE INDEX IF NOT EXISTS report_jobs_finished ON report_jobs (finished_at);
+"""
+
+
+class SharedDatabase:
+    """One SQLite file, with a connection per thread."""
+
+    def __init__(self, path: str, timeout: float = 30.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        # executescript() manages its own transaction; every statement is idempotent.
+        self.connection().executescript(_SCHEMA)
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def write(self) -> Iterator[sqlite3.Connection]:
+        """Run a write transaction holding SQLite's cross-process write lock."""
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    @contextmanager
+    def read(self) -> Iterator[sqlite3.Connection]:
+        """Run the enclosed reads in one transaction so they see one snapshot.
+
+        Nested uses join the enclosing transaction.
+        """
+        conn = self.connection()
+        if conn.in_transaction:
+            yield conn
+            return
+        conn.execute("BEGIN")
+        try:
+            yield conn
+        finally:
+            conn.execute("COMMIT")
+
+    def next_id(self, name: str) -> int:
+        with self.write() as conn:
+            return _next_id(conn, name)
+
+    def version(self, name: str) -> int:
+        row = self.connection().execute("SELECT value FROM versions WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else 0
+
+    def reset(self):
+        """Delete all data and restart id sequences. Versions keep increasing."""
+        with self.write() as conn:
+            conn.execute("DELETE FROM users")
+            conn.execute("DELETE FROM courses")
+            conn.execute("DELETE FROM enrollments")
+            conn.execute("DELETE FROM sequences")
+            for name in ("users", "courses", "enrollments"):
+                _bump(conn, name)
+
+
+def _next_id(conn: sqlite3.Connection, name: str) -> int:
+    return conn.execute(
+        "INSERT INTO sequences (name, value) VALUES (?, 1) "
+        "ON CONFLICT (name) DO UPDATE SET value = value + 1 RETURNING value",
+        (name,),
+    ).fetchone()[0]
+
+
+def _bump(conn: sqlite3.Connection, name: str):
+    conn.execute(
+        "INSERT INTO versions (name, value) VALUES (?, 1) "
+        "ON CONFLICT (name) DO UPDATE SET value = value + 1",
+        (name,),
+    )
+
+
+class SharedSnapshot:
+    """Rows read in one transaction, so they form a consistent view."""
+
+    def __init__(self, rows: list[tuple], version: int):
+        self._rows = rows
+        self.version = version
+
+    def items(self):
+        return iter(self._rows)
+
+    def values(self):
+        return (value for _, value in self._rows)
+
+    def keys(self):
+        return (key for key, _ in self._rows)
+
+    __iter__ = keys
+
+
+class SharedTable:
+    """``Table`` interface over one SQLite table of JSON records keyed by id."""
+
+    def __init__(self, db: SharedDatabase, name: str):
+        self.db = db
+        self.name = name
+
+    @property
+    def version(self) -> int:
+        return self.db.version(self.name)
+
+    def snapshot(self) -> SharedSnapshot:
+        # Read the version and rows in one read transaction so they agree.
+        with self.db.read() as conn:
+            version = self.db.version(self.name)
+            rows = conn.execute(f"SELECT id, data FROM {self.name} ORDER BY id").fetchall()
+        return SharedSnapshot([(key, json.loads(data)) for key, data in rows], version)
+
+    def get(self, key, default=None):
+        row = self.db.connection().execute(f"SELECT data FROM {self.name} WHERE id = ?", (key,)).fetchone()
+        return default if row is None else json.loads(row[0])
+
+    def get_many(self, keys) -> dict:
+        """Records for every key that exists, fetched in one query."""
+        rows = self.db.connection().execute(
+            f"SELECT id, data FROM {self.name} WHERE id IN (SELECT value FROM json_each(?))",
+            (json.dumps(list(keys)),),
+        ).fetchall()
+        return {key: json.loads(data) for key, data in rows}
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key) -> bool:
+        row = self.db.connection().execute(f"SELECT 1 FROM {self.name} WHERE id = ?", (key,)).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        return self.db.connection().execute(f"SELECT COUNT(*) FROM {self.name}").fetchone()[0]
+
+    def __iter__(self):
+        return iter(self.snapshot())
+
+    def keys(self):
+        return self.snapshot().keys()
+
+    def values(self):
+        return self.snapshot().values()
+
+    def items(self):
+        return self.snapshot().items()
+
+    def __setitem__(self, key, value):
+        with self.db.write() as conn:
+            conn.execute(
+                f"INSERT INTO {self.name} (id, data) VALUES (?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET data = excluded.data",
+                (key, json.dumps(value)),
+            )
+            _bump(conn, self.name)
+
+    def __delitem__(self, key):
+        if self.pop(key) is None:
+            raise KeyError(key)
+
+    def pop(self, key, default=None):
+        with self.db.write() as conn:
+            row = conn.execute(f"DELETE FROM {self.name} WHERE id = ? RETURNING data", (key,)).fetchone()
+            if row is None:
+                return default
+            _bump(conn, self.name)
+        return json.loads(row[0])
+
+    def clear(self):
+        with self.db.write() as conn:
+            conn.execute(f"DELETE FROM {self.name}")
+            _bump(conn, self.name)
+
+
+def _enrollment(row: tuple) -> dict:
+    return {"id": row[0], "user_id": row[1], "course_id": row[2]}
+
+
+class SharedEnrollmentStore:
+    """``ShardedEnrollmentStore`` interface over the shared ``enrollments`` table.
+
+    SQLite provides the locking, so there is a single logical shard.
+    """
+
+    num_shards = 1
+
+    def __init__(self, db: SharedDatabase):
+        self.db = db
+
+    def configure(self, num_shards: int):
+        """Shard count does not apply to the shared store; this only clears it."""
+        self.clear()
+
+    def clear(self):
+        with self.db.write() as conn:
+            conn.execute("DELETE FROM enrollments")
+            _bump(conn, "enrollments")
+
+    @property
+    def version(self) -> int:
+        return self.db.version("enrollments")
+
+    def course_version(self, course_id: int) -> int:
+        return self.version
+
+    def lock_all(self):
+        # Every read below is a single statement and therefore already consistent.
+        return nullcontext()
+
+    def add(self, user_id: int, course_id: int) -> dict:
+        """Create an enrollment, raising DuplicateEnrollmentError if it already exists."""
+        try:
+            with self.db.write() as conn:
+                enrollment_id = _next_id(conn, "enrollments")
+                conn.execute(
+                    "INSERT INTO enrollments (id, user_id, course_id) VALUES (?, ?, ?)",
+                    (enrollment_id, user_id, course_id),
+                )
+                _bump(conn, "enrollments")
+        except sqlite3.IntegrityError:
+            raise DuplicateEnrollmentError("Student is already enrolled in this course")
+        return {"id": enrollment_id, "user_id": user_id, "course_id": course_id}
+
+    def get(self, enrollment_id: int) -> Optional[dict]:
+        row = self.db.connection().execute(
+            "SELECT id, user_id, course_id FROM enrollments WHERE id = ?", (enrollment_id,)
+        ).fetchone()
+        return None if row is None else _enrollment(row)
+
+    def remove(self, enrollment_id: int) -> Optional[dict]:
+        """Delete an enrollment and return it, or None if it does not exist."""
+        with self.db.write() as conn:
+            row = conn.execute(
+                "DELETE FROM enrollments WHERE id = ? RETURNING id, user_id, course_id", (enrollment_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            _bump(conn, "enrollments")
+        return _enrollment(row)
+
+    def _select(self, where: str = "", params: tuple = ()) -> list[dict]:
+        rows = self.db.connection().execute(
+            f"SELECT id, user_id, course_id FROM enrollments {where} ORDER BY id", params
+        ).fetchall()
+        return [_enrollment(row) for row in rows]
+
+    def for_course(self, course_id: int) -> list[dict]:
+        return self._select("WHERE course_id = ?", (course_id,))
+
+    def for_student(self, user_id: int) -> list[dict]:
+        return self._select("WHERE user_id = ?", (user_id,))
+
+    def all(self) -> list[dict]:
+        return self._select()
+
+    def __len__(self) -> int:
+        return self.db.connection().execute("SELECT COUNT(*) FROM enrollments").fetchone()[0]
+
+    def __contains__(self, enrollment_id: int) -> bool:
+        return self.get(enrollment_id) is not None
@@ -1,40 +1,61 @@
-"""In-memory data store for users, courses, and enrollments."""
+"""Data store for users, courses, and enrollments.
 
-# Data stores
-users: dict[int, dict] = {}
-courses: dict[int, dict] = {}
-enrollments: dict[int, dict] = {}
+In-memory by default. When ``STORE_PATH`` is set every worker process uses the
+SQLite file at that path instead (see ``app.data.shared``), so
+``uvicorn --workers N`` serves one shared dataset.
+"""
+
+from typing import Optional
+
+from app.config import ENROLLMENT_SHARDS, STORE_PATH
+from app.data.shards import ShardedEnrollmentStore
+from app.data.shared import SharedDatabase, SharedEnrollmentStore, SharedTable
+from app.data.tables import Table
 
-# Auto-increment counters
+shared_db: Optional[SharedDatabase] = SharedDatabase(STORE_PATH) if STORE_PATH else None
+
+# Data stores
+if shared_db is not None:
+    users = SharedTable(shared_db, "users")
+    courses = SharedTable(shared_db, "courses")
+    enrollments = SharedEnrollmentStore(shared_db)
+else:
+    users = Table()
+    courses = Table()
+    enrollments = ShardedEnrollmentStore(ENROLLMENT_SHARDS)
+
+# Auto-increment counters (enrollment ids are allocated by their store)
 user_id_counter: int = 0
 course_id_counter: int = 0
-enrollment_id_counter: int = 0
 
 
 def get_next_user_id() -> int:
     global user_id_counter
+    if shared_db is not None:
+        return shared_db.next_id("users")
     user_id_counter += 1
     return user_id_counter
 
 
 def get_next_course_id() -> int:
     global course_id_counter
+    if shared_db is not None:
+        return shared_db.next_id("courses")
     course_id_counter += 1
     return course_id_counter
 
 
-def get_next_enrollment_id() -> int:
-    global enrollment_id_counter
-    enrollment_id_counter += 1
-    return enrollment_id_counter
-
+def reset_store(num_shards: Optional[int] = None):
+    """Reset all data stores. Used in tests.
 
-def reset_store():
-    """Reset all data stores. Used in tests."""
-    global user_id_counter, course_id_counter, enrollment_id_counter
-    users.clear()
-    courses.clear()
-    enrollments.clear()
+    Pass ``num_shards`` to also change how many shards enrollments are split into.
+    """
+    global user_id_counter, course_id_counter
+    if shared_db is not None:
+        shared_db.reset()
+    else:
+        users.clear()
+        courses.clear()
+        enrollments.configure(num_shards or enrollments.num_shards)
     user_id_counter = 0
     course_id_counter = 0
-    enrollment_id_counter = 0
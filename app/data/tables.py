@@ -0,0 +1,243 @@
+"""Versioned record tables with point-in-time snapshots.
+
+A ``Table`` keeps its rows in an append-only log. Each row holds a chain of
+``(value, version, previous)`` nodes plus the version it was deleted at, so a
+reader holding a snapshot (log, length, version) can iterate a consistent view
+while writers keep appending, replacing and deleting. Taking a snapshot is
+O(1) and never copies data.
+
+The table counts its live snapshots by version. Superseded values and deleted
+rows older than the oldest live snapshot (the horizon) are garbage: with no
+snapshot alive an update simply replaces the row's chain, and once garbage
+passes a quarter of the live rows the writers compact the log incrementally,
+a bounded number of rows per write, dropping rows deleted before the horizon
+and trimming chains down to it. The compacted log is swapped in when the pass
+reaches the end; snapshots still reading the old log keep it alive until they
+are dropped.
+"""
+
+import threading
+from collections import deque
+from itertools import islice
+from typing import Any, Iterator, Optional
+
+# Garbage entries tolerated before small tables compact.
+_COMPACT_MIN = 32
+# Rows compacted per write while a pass is in progress.
+_COMPACT_STEP = 256
+
+
+class _Row:
+    __slots__ = ("key", "head", "deleted")
+
+    def __init__(self, key, head: tuple):
+        self.key = key
+        # (value, version, previous node) - replaced as a whole so reads never tear.
+        self.head = head
+        self.deleted: Optional[int] = None
+
+
+def _visible(row: _Row, version: int):
+    """Return the row's node as of ``version``, or None if it was not visible."""
+    deleted = row.deleted
+    if deleted is not None and deleted <= version:
+        return None
+    node = row.head
+    while node is not None and node[1] > version:
+        node = node[2]
+    return node
+
+
+def _trim(head: tuple, horizon: int) -> tuple:
+    """Drop the nodes of a chain that no snapshot at or after ``horizon`` can see."""
+    newer = []
+    node = head
+    while node is not None and node[1] > horizon:
+        newer.append(node)
+        node = node[2]
+    if node is None or node[2] is None:
+        return head
+    node = (node[0], node[1], None)
+    for value, version, _ in reversed(newer):
+        node = (value, version, node)
+    return node
+
+
+class TableSnapshot:
+    """Immutable point-in-time view of a ``Table``, in insertion order."""
+
+    __slots__ = ("_log", "_length", "version", "_released")
+
+    def __init__(self, log: list, length: int, version: int, released: deque):
+        self._log = log
+        self._length = length
+        self.version = version
+        self._released = released
+
+    def __del__(self):
+        # Lock-free hand-off: the table drains this queue under its own lock.
+        self._released.append(self.version)
+
+    def _nodes(self) -> Iterator[tuple]:
+        version = self.version
+        for row in islice(self._log, self._length):
+            node = _visible(row, version)
+            if node is not None:
+                yield row.key, node[0]
+
+    def items(self) -> Iterator[tuple]:
+        return self._nodes()
+
+    def values(self) -> Iterator:
+        return (value for _, value in self._nodes())
+
+    def keys(self) -> Iterator:
+        return (key for key, _ in self._nodes())
+
+    __iter__ = keys
+
+
+class Table:
+    """A dict-like store of records with O(1) snapshots.
+
+    Point reads (``get``, ``[]``, ``in``) see the latest committed value;
+    ``values()``, ``items()`` and iteration read from a fresh snapshot so they
+    are safe against concurrent writes. ``version`` increases on every write
+    and never goes backwards, so callers can key caches on it. Records must be
+    replaced rather than mutated in place.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self._lock = threading.Lock()
+        self._log: list[_Row] = []
+        self._live: dict[Any, _Row] = {}
+        self._garbage = 0
+        # Live snapshot count per version, and versions of snapshots since dropped.
+        self._readers: dict[int, int] = {}
+        self._released: deque = deque()
+        # Compacted log under construction and how far into ``_log`` it has got.
+        self._compacted: Optional[list[_Row]] = None
+        self._cursor = 0
+
+    # ── Reads ────────────────────────────────────────────────────────────────
+
+    def snapshot(self) -> TableSnapshot:
+        with self._lock:
+            # Read-mostly tables may go a long time between writes, so settle releases here too.
+            self._drain_released()
+            self._readers[self.version] = self._readers.get(self.version, 0) + 1
+            return TableSnapshot(self._log, len(self._log), self.version, self._released)
+
+    def get(self, key, default=None):
+        row = self._live.get(key)
+        return default if row is None else row.head[0]
+
+    def __getitem__(self, key):
+        return self._live[key].head[0]
+
+    def __contains__(self, key) -> bool:
+        return key in self._live
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def __iter__(self):
+        return iter(self.snapshot())
+
+    def keys(self):
+        return self.snapshot().keys()
+
+    def values(self):
+        return self.snapshot().values()
+
+    def items(self):
+        return self.snapshot().items()
+
+    # ── Writes ───────────────────────────────────────────────────────────────
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self.version += 1
+            row = self._live.get(key)
+            if row is None:
+                row = _Row(key, (value, self.version, None))
+                self._log.append(row)
+                self._live[key] = row
+            elif self._has_readers():
+                row.head = (value, self.version, row.head)
+                self._garbage += 1
+            else:
+                row.head = (value, self.version, None)
+            self._maybe_compact()
+
+    def __delitem__(self, key):
+        with self._lock:
+            row = self._live.pop(key)
+            self.version += 1
+            row.deleted = self.version
+            self._garbage += 1
+            self._maybe_compact()
+
+    def pop(self, key, default=None):
+        with self._lock:
+            row = self._live.pop(key, None)
+            if row is None:
+                return default
+            self.version += 1
+            row.deleted = self.version
+            self._garbage += 1
+            self._maybe_compact()
+            return row.head[0]
+
+    def clear(self):
+        with self._lock:
+            self.version += 1
+            self._log = []
+            self._live = {}
+            self._garbage = 0
+            self._compacted = None
+            self._cursor = 0
+
+    # ── Compaction (caller holds ``_lock``) ──────────────────────────────────
+
+    def _drain_released(self):
+        released = self._released
+        while released:
+            version = released.popleft()
+            count = self._readers[version] - 1
+            if count:
+                self._readers[version] = count
+            else:
+                del self._readers[version]
+
+    def _has_readers(self) -> bool:
+        self._drain_released()
+        return bool(self._readers)
+
+    def _horizon(self) -> int:
+        """Oldest version any live snapshot can read."""
+        return min(self._readers) if self._has_readers() else self.version
+
+    def _maybe_compact(self):
+        """Advance the compaction pass, starting one once garbage is a quarter of the live rows."""
+        if self._compacted is None:
+            if self._garbage < max(_COMPACT_MIN, len(self._live) // 4):
+                return
+            self._compacted = []
+            self._cursor = 0
+            # Writes during the pass count towards the next one.
+            self._garbage = 0
+        horizon = self._horizon()
+        log, compacted = self._log, self._compacted
+        end = min(self._cursor + _COMPACT_STEP, len(log))
+        for row in islice(log, self._cursor, end):
+            if row.deleted is not None and row.deleted <= horizon:
+                continue
+            # Rows are shared with the old log, so trim only what no snapshot can see.
+            row.head = _trim(row.head, horizon)
+            compacted.append(row)
+        self._cursor = end
+        if end == len(log):
+            self._log = compacted
+            self._compacted = None
@@ -1,20 +1,56 @@
 """Course Enrollment Management API - Main Application."""
 
+from app import startup  # first, so the import phase is timed from here
+
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
-from app.routers import users, courses, enrollments
+from app.compression import CompressionMiddleware
+from app.config import STARTUP_WARMUP, TRAFFIC_CAPTURE_PATH, TRAFFIC_CAPTURE_SAMPLE
+from app.reports.jobs import manager as report_jobs
+from app.routers import users, courses, enrollments, reports, health
+from app.traffic import TraceWriter, TrafficCaptureMiddleware
+
+startup.mark("import")
+
+trace_writer = TraceWriter(TRAFFIC_CAPTURE_PATH) if TRAFFIC_CAPTURE_PATH else None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if STARTUP_WARMUP:
+        await startup.warm_up(app)
+    startup.set_ready(True)
+    yield
+    startup.set_ready(False)
+    report_jobs.shutdown()
+    if trace_writer is not None:
+        trace_writer.close()
+
 
 app = FastAPI(
     title="Course Enrollment Management API",
     description="A RESTful API for managing course enrollments with role-based access control.",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(startup.FirstRequestTimer)
+if trace_writer is not None:
+    app.add_middleware(TrafficCaptureMiddleware, writer=trace_writer, sample=TRAFFIC_CAPTURE_SAMPLE)
+
 app.include_router(users.router)
 app.include_router(courses.router)
 app.include_router(enrollments.router)
+app.include_router(reports.router)
+app.include_router(health.router)
 
 
 @app.get("/")
 def root():
     return {"Course Enrollment Management API"}
+
+
+startup.mark("app")
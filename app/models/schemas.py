@@ -89,3 +89,25 @@ class EnrollmentResponse(BaseModel):
     id: int
     user_id: int
     course_id: int
+
+
+# Report Models 
+
+class ReportKindEnum(str, Enum):
+    roster = "roster"
+    transcript = "transcript"
+
+
+class JobStatusEnum(str, Enum):
+    queued = "queued"
+    running = "running"
+    completed = "completed"
+    failed = "failed"
+
+
+class ReportJobResponse(BaseModel):
+    id: str
+    kind: ReportKindEnum
+    status: JobStatusEnum
+    progress: float
+    error: Optional[str] = None
@@ -0,0 +1,69 @@
+"""Sparse fieldsets: ``?fields=a,b`` projections of read responses.
+
+A requested fieldset is validated against the endpoint's response model and
+canonicalised to schema order. Projected responses skip response-model
+validation entirely: each distinct fieldset compiles once into a serializer
+that picks the fields straight out of the stored records and encodes JSON,
+and the compiled serializers are kept in an LRU cache.
+"""
+
+import json
+from functools import lru_cache
+from operator import itemgetter
+from typing import Callable, Iterable, Optional, Union
+
+from fastapi import HTTPException, Query, Response, status
+from pydantic import BaseModel
+
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+
+def fieldset(model: type[BaseModel]) -> Callable[..., Optional[tuple[str, ...]]]:
+    """Dependency parsing ``fields`` into a tuple of ``model`` field names.
+
+    Resolves to None when no projection is needed (parameter absent or every
+    field requested), so the endpoint can take its normal response path.
+    """
+    allowed = tuple(model.model_fields)
+
+    def dependency(
+        fields: Optional[str] = Query(
+            None, description=f"Comma-separated subset of fields to return: {', '.join(allowed)}"
+        ),
+    ) -> Optional[tuple[str, ...]]:
+        if fields is None:
+            return None
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = sorted(requested.difference(allowed))
+        if unknown or not requested:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+                detail=f"Unknown fields: {', '.join(unknown)}" if unknown else "fields must not be empty",
+            )
+        if len(requested) == len(allowed):
+            return None
+        return tuple(name for name in allowed if name in requested)
+
+    return dependency
+
+
+@lru_cache(maxsize=128)
+def compile_projection(fields: tuple[str, ...]) -> Callable[[dict], dict]:
+    """Build a function mapping a stored record to a dict of just ``fields``."""
+    if len(fields) == 1:
+        (name,) = fields
+        return lambda record: {name: record[name]}
+    getter = itemgetter(*fields)
+    return lambda record: dict(zip(fields, getter(record)))
+
+
+def project(data: Union[dict, Iterable[dict]], fields: Optional[tuple[str, ...]]):
+    """Return ``data`` unchanged, or a JSON response of its projection onto ``fields``."""
+    if fields is None:
+        return data
+    projector = compile_projection(fields)
+    if isinstance(data, dict):
+        body = projector(data)
+    else:
+        body = list(map(projector, data))
+    return Response(content=_encode(body), media_type="application/json")
@@ -0,0 +1,416 @@
+"""Background execution of report jobs on a process pool.
+
+A job is built from a point-in-time snapshot taken when it is submitted, split
+into chunks and rendered by worker processes; a small coordinator thread pool
+bounds how many jobs run at once and writes the chunks, in order, to a
+temporary file. Identical in-flight requests share one job without taking
+another snapshot, and a background sweeper deletes finished results once
+their TTL has passed.
+
+With ``STORE_PATH`` set, ``SharedReportJobManager`` keeps the job table in the
+shared SQLite database and writes results to a directory every worker can
+read, so a job started on one worker can be polled and downloaded from any
+other, and duplicates are coalesced across workers.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, Optional
+
+from app.config import (
+    REPORT_MAX_CONCURRENT_JOBS,
+    REPORT_MAX_PENDING_JOBS,
+    REPORT_RESULT_DIR,
+    REPORT_RESULT_TTL,
+    REPORT_WORKERS,
+)
+from app.data.shared import SharedDatabase
+from app.data.store import shared_db
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+
+class JobQueueFullError(RuntimeError):
+    """Raised when too many report jobs are already queued or running."""
+
+
+@dataclass
+class ReportSpec:
+    """Everything a worker needs to render one report, captured at submit time."""
+
+    filename: str
+    header: str
+    render: Callable[..., str]
+    chunks: list[tuple]
+
+
+@dataclass
+class ReportJob:
+    id: str
+    kind: str
+    key: tuple
+    filename: str = ""
+    status: str = "queued"
+    chunks_done: int = 0
+    chunks_total: int = 0
+    error: Optional[str] = None
+    path: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    @property
+    def progress(self) -> float:
+        if self.status == "completed":
+            return 1.0
+        if not self.chunks_total:
+            return 0.0
+        return self.chunks_done / self.chunks_total
+
+
+class ReportJobManager:
+    """Queue, run and expire report jobs held in this process's memory.
+
+    Results go to ``result_dir`` when given, otherwise to a private temporary
+    directory that is removed on shutdown.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = REPORT_WORKERS,
+        max_concurrent_jobs: int = REPORT_MAX_CONCURRENT_JOBS,
+        max_pending_jobs: int = REPORT_MAX_PENDING_JOBS,
+        ttl_seconds: float = REPORT_RESULT_TTL,
+        result_dir: Optional[str] = None,
+    ):
+        self.max_workers = max_workers
+        self.max_concurrent_jobs = max_concurrent_jobs
+        self.max_pending_jobs = max_pending_jobs
+        self.ttl_seconds = ttl_seconds
+        self.result_dir = result_dir
+        self._lock = threading.Lock()
+        self._jobs: dict[str, ReportJob] = {}
+        self._inflight: dict[tuple, ReportJob] = {}
+        self._processes: Optional["ProcessPoolExecutor"] = None
+        self._coordinators: Optional[ThreadPoolExecutor] = None
+        self._result_dir: Optional[str] = None
+        self._sweeper: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def submit(self, kind: str, key: tuple, build: Callable[[], ReportSpec]) -> ReportJob:
+        """Queue a report, or return the in-flight job already producing it.
+
+        ``build`` takes the snapshot and is only called for a new job, so
+        coalesced duplicates never pay for it.
+        """
+        key = (kind, *key)
+        with self._lock:
+            job, created = self._claim(kind, key)
+        if not created:
+            return job
+
+        try:
+            spec = build()
+        except BaseException:
+            with self._lock:
+                self._release(job)
+            raise
+        self._update(job, filename=spec.filename, chunks_total=len(spec.chunks))
+
+        with self._lock:
+            self._ensure_pools()
+            # Pass the pool and directory in: shutdown() clears the attributes while jobs finish.
+            self._coordinators.submit(self._run, job, spec, self._processes, self._result_dir)
+        return job
+
+    def get(self, job_id: str) -> Optional[ReportJob]:
+        with self._lock:
+            self._expire()
+            return self._lookup(job_id)
+
+    def shutdown(self):
+        """Stop the pools and give up on unfinished jobs. The manager stays usable."""
+        with self._lock:
+            coordinators, processes = self._coordinators, self._processes
+            result_dir, sweeper = self._result_dir, self._sweeper
+            self._coordinators = self._processes = self._result_dir = self._sweeper = None
+            self._stop.set()
+        if sweeper is not None:
+            sweeper.join()
+        self._stop.clear()
+        if coordinators is not None:
+            coordinators.shutdown(wait=True, cancel_futures=True)
+        if processes is not None:
+            processes.shutdown(wait=True, cancel_futures=True)
+        with self._lock:
+            self._abandon()
+        if result_dir is not None and self.result_dir is None:
+            shutil.rmtree(result_dir, ignore_errors=True)
+
+    # ── Job table (caller holds ``_lock`` unless noted) ──────────────────────
+
+    def _claim(self, kind: str, key: tuple) -> tuple[ReportJob, bool]:
+        """Return the in-flight job for ``key``, or reserve a new one: (job, created)."""
+        job = self._inflight.get(key)
+        if job is not None:
+            return job, False
+        if len(self._inflight) >= self.max_pending_jobs:
+            raise JobQueueFullError("Too many report jobs in progress, try again later")
+        # Reserve the key before building so concurrent duplicates find this job.
+        job = ReportJob(id=uuid.uuid4().hex, kind=kind, key=key)
+        self._jobs[job.id] = job
+        self._inflight[key] = job
+        return job, True
+
+    def _release(self, job: ReportJob):
+        """Forget a job whose spec could not be built."""
+        self._jobs.pop(job.id, None)
+        if self._inflight.get(job.key) is job:
+            del self._inflight[job.key]
+
+    def _update(self, job: ReportJob, **changes):
+        """Record progress on a job. Safe to call without ``_lock``."""
+        for name, value in changes.items():
+            setattr(job, name, value)
+
+    def _finish(self, job: ReportJob, **changes):
+        self._update(job, **changes, finished_at=time.time())
+        if self._inflight.get(job.key) is job:
+            del self._inflight[job.key]
+
+    def _lookup(self, job_id: str) -> Optional[ReportJob]:
+        return self._jobs.get(job_id)
+
+    def _abandon(self):
+        """Drop every job; shutdown already removes their result directory."""
+        self._jobs.clear()
+        self._inflight.clear()
+
+    def _expire(self):
+        """Drop finished jobs older than the TTL."""
+        cutoff = time.time() - self.ttl_seconds
+        expired = [
+            job for job in self._jobs.values()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job in expired:
+            del self._jobs[job.id]
+            if job.path:
+                _unlink(job.path)
+
+    # ── Execution ────────────────────────────────────────────────────────────
+
+    def _ensure_pools(self):
+        if self._coordinators is None:
+            self._coordinators = ThreadPoolExecutor(
+                max_workers=self.max_concurrent_jobs, thread_name_prefix="report-job"
+            )
+        if self._processes is None:
+            # Imported here to keep multiprocessing off the worker boot path.
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            # "spawn" keeps workers independent of the server's threads and locks.
+            self._processes = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        if self._result_dir is None:
+            if self.result_dir is None:
+                self._result_dir = tempfile.mkdtemp(prefix="reports-")
+            else:
+                os.makedirs(self.result_dir, exist_ok=True)
+                self._result_dir = self.result_dir
+        self._ensure_sweeper()
+
+    def _ensure_sweeper(self):
+        if self._sweeper is None:
+            self._sweeper = threading.Thread(target=self._sweep, name="report-sweeper", daemon=True)
+            self._sweeper.start()
+
+    def _sweep_interval(self) -> float:
+        return min(max(self.ttl_seconds / 2, 0.05), 60.0)
+
+    def _sweep(self):
+        """Expire results periodically so files are removed even when nobody calls the API."""
+        interval = self._sweep_interval()
+        while not self._stop.wait(interval):
+            with self._lock:
+                self._expire()
+
+    def _run(self, job: ReportJob, spec: ReportSpec, processes: "ProcessPoolExecutor", result_dir: str):
+        # Already loaded by _ensure_pools; kept out of the module imports for boot time.
+        from concurrent.futures.process import BrokenProcessPool
+
+        self._update(job, status="running")
+        fd, path = tempfile.mkstemp(suffix=".csv", dir=result_dir)
+        try:
+            with os.fdopen(fd, "w", newline="") as out:
+                out.write(spec.header)
+                futures = [processes.submit(spec.render, *args) for args in spec.chunks]
+                for future in futures:
+                    out.write(future.result())
+                    self._update(job, chunks_done=job.chunks_done + 1)
+            changes = {"path": path, "status": "completed"}
+        except BrokenProcessPool as exc:
+            _unlink(path)
+            changes = {"error": str(exc) or type(exc).__name__, "status": "failed"}
+            # A render process died; replace the pool so later jobs do not inherit the failure.
+            with self._lock:
+                if self._processes is processes:
+                    self._processes = None
+            processes.shutdown(wait=False, cancel_futures=True)
+        except Exception as exc:
+            _unlink(path)
+            changes = {"error": str(exc) or type(exc).__name__, "status": "failed"}
+        with self._lock:
+            self._finish(job, **changes)
+
+
+_JOB_COLUMNS = (
+    "id", "kind", "key", "filename", "status", "chunks_done", "chunks_total",
+    "error", "path", "created_at", "finished_at",
+)
+
+
+# Missed heartbeats after which an unfinished shared job is considered dead.
+_STALE_HEARTBEATS = 6
+
+
+def _job_from_row(row: tuple) -> ReportJob:
+    job = ReportJob(**dict(zip(_JOB_COLUMNS, row)))
+    job.key = tuple(json.loads(job.key))
+    return job
+
+
+class SharedReportJobManager(ReportJobManager):
+    """``ReportJobManager`` whose job table lives in the shared SQLite database.
+
+    Jobs run on the worker that accepted them; their state is written to the
+    ``report_jobs`` table and their results to ``result_dir``, so every
+    worker sees them. The pending-job limit applies across all workers.
+
+    The owning manager's sweeper stamps ``updated_at`` on its unfinished jobs
+    every ``heartbeat_seconds``. Unfinished jobs whose stamp is older than
+    ``_STALE_HEARTBEATS`` heartbeats belong to a worker that was killed; they
+    are failed so their key and pending slot are freed.
+    """
+
+    def __init__(self, db: SharedDatabase, result_dir: str, heartbeat_seconds: float = 5.0, **kwargs):
+        super().__init__(result_dir=result_dir, **kwargs)
+        self.db = db
+        self.heartbeat_seconds = heartbeat_seconds
+        # Unique per manager, so a restarted worker that reuses a pid never adopts old jobs.
+        self.owner = uuid.uuid4().hex
+
+    def get(self, job_id: str) -> Optional[ReportJob]:
+        # Expiry is left to the sweeper so polling never takes the write lock;
+        # every worker answering polls runs one, whether or not it ran the job.
+        with self._lock:
+            self._ensure_sweeper()
+        job = self._lookup(job_id)
+        if job is None or (job.finished_at is not None and job.finished_at < time.time() - self.ttl_seconds):
+            return None
+        return job
+
+    def _claim(self, kind: str, key: tuple) -> tuple[ReportJob, bool]:
+        encoded = json.dumps(key)
+        with self.db.write() as conn:
+            self._fail_stale(conn)
+            row = conn.execute(
+                f"SELECT {', '.join(_JOB_COLUMNS)} FROM report_jobs WHERE key = ? AND finished_at IS NULL",
+                (encoded,),
+            ).fetchone()
+            if row is not None:
+                return _job_from_row(row), False
+            pending = conn.execute("SELECT COUNT(*) FROM report_jobs WHERE finished_at IS NULL").fetchone()[0]
+            if pending >= self.max_pending_jobs:
+                raise JobQueueFullError("Too many report jobs in progress, try again later")
+            job = ReportJob(id=uuid.uuid4().hex, kind=kind, key=key)
+            conn.execute(
+                "INSERT INTO report_jobs (id, kind, key, owner, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job.id, kind, encoded, self.owner, job.status, job.created_at, job.created_at),
+            )
+        # Heartbeats must start before the (possibly slow) snapshot is built.
+        self._ensure_sweeper()
+        return job, True
+
+    def _release(self, job: ReportJob):
+        with self.db.write() as conn:
+            conn.execute("DELETE FROM report_jobs WHERE id = ?", (job.id,))
+
+    def _update(self, job: ReportJob, **changes):
+        super()._update(job, **changes)
+        with self.db.write() as conn:
+            conn.execute(
+                f"UPDATE report_jobs SET {''.join(f'{name} = ?, ' for name in changes)}updated_at = ? WHERE id = ?",
+                (*changes.values(), time.time(), job.id),
+            )
+
+    def _finish(self, job: ReportJob, **changes):
+        # A finish time releases the key for new submissions on every worker.
+        self._update(job, **changes, finished_at=time.time())
+
+    def _lookup(self, job_id: str) -> Optional[ReportJob]:
+        row = self.db.connection().execute(
+            f"SELECT {', '.join(_JOB_COLUMNS)} FROM report_jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        return None if row is None else _job_from_row(row)
+
+    def _abandon(self):
+        """Fail this worker's unfinished jobs so other workers stop waiting on them."""
+        with self.db.write() as conn:
+            conn.execute(
+                "UPDATE report_jobs SET status = 'failed', error = 'Report worker stopped', finished_at = ? "
+                "WHERE owner = ? AND finished_at IS NULL",
+                (time.time(), self.owner),
+            )
+
+    def _fail_stale(self, conn):
+        """Fail unfinished jobs whose owner stopped sending heartbeats."""
+        now = time.time()
+        conn.execute(
+            "UPDATE report_jobs SET status = 'failed', error = 'Report worker stopped responding', "
+            "finished_at = ? WHERE finished_at IS NULL AND updated_at < ?",
+            (now, now - self.heartbeat_seconds * _STALE_HEARTBEATS),
+        )
+
+    def _sweep_interval(self) -> float:
+        return min(super()._sweep_interval(), self.heartbeat_seconds)
+
+    def _expire(self):
+        """Send this worker's heartbeat, fail stale jobs and delete expired ones."""
+        now = time.time()
+        with self.db.write() as conn:
+            conn.execute(
+                "UPDATE report_jobs SET updated_at = ? WHERE owner = ? AND finished_at IS NULL", (now, self.owner)
+            )
+            self._fail_stale(conn)
+            expired = conn.execute(
+                "DELETE FROM report_jobs WHERE finished_at < ? RETURNING path", (now - self.ttl_seconds,)
+            ).fetchall()
+        for (path,) in expired:
+            if path:
+                _unlink(path)
+
+
+def _unlink(path: str):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+if shared_db is not None:
+    manager: ReportJobManager = SharedReportJobManager(
+        shared_db, result_dir=REPORT_RESULT_DIR or f"{shared_db.path}-reports"
+    )
+else:
+    manager = ReportJobManager(result_dir=REPORT_RESULT_DIR or None)
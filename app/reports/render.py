@@ -0,0 +1,39 @@
+"""CSV rendering for report jobs.
+
+These functions run inside worker processes, so they take plain picklable
+data and must not import the web application.
+"""
+
+import csv
+import io
+
+ROSTER_HEADER = ["enrollment_id", "student_id", "name", "email"]
+TRANSCRIPT_HEADER = ["enrollment_id", "course_id", "code", "title"]
+
+
+def _write(rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+
+def render_header(columns: list[str]) -> str:
+    return _write([columns])
+
+
+def render_roster(enrollments: list[dict], users: dict[int, dict]) -> str:
+    """Render roster rows for a chunk of one course's enrollments."""
+    rows = []
+    for e in enrollments:
+        user = users.get(e["user_id"], {})
+        rows.append([e["id"], e["user_id"], user.get("name", ""), user.get("email", "")])
+    return _write(rows)
+
+
+def render_transcript(enrollments: list[dict], courses: dict[int, dict]) -> str:
+    """Render transcript rows for a chunk of one student's enrollments."""
+    rows = []
+    for e in enrollments:
+        course = courses.get(e["course_id"], {})
+        rows.append([e["id"], e["course_id"], course.get("code", ""), course.get("title", "")])
+    return _write(rows)
@@ -0,0 +1,61 @@
+"""Snapshot the store into report specs ready to hand to the job manager."""
+
+from app.config import REPORT_CHUNK_SIZE
+from app.data.store import courses, enrollments, shared_db, users
+from app.reports.jobs import ReportSpec
+from app.reports.render import (
+    ROSTER_HEADER,
+    TRANSCRIPT_HEADER,
+    render_header,
+    render_roster,
+    render_transcript,
+)
+
+
+def _chunked(records: list[dict], chunk_size: int) -> list[list[dict]]:
+    return [records[i:i + chunk_size] for i in range(0, len(records), chunk_size)]
+
+
+def roster_spec(course_id: int, chunk_size: int = REPORT_CHUNK_SIZE) -> ReportSpec:
+    """Roster of everyone enrolled in a course. The caller checks the course exists."""
+    if shared_db is not None:
+        # One read transaction and one query per table, however large the course.
+        with shared_db.read():
+            rows = enrollments.for_course(course_id)
+            students = users.get_many({e["user_id"] for e in rows})
+            code = courses[course_id]["code"]
+    else:
+        # A course lives in exactly one shard, so this read is already consistent.
+        rows = enrollments.for_course(course_id)
+        students = {e["user_id"]: users[e["user_id"]] for e in rows if e["user_id"] in users}
+        code = courses[course_id]["code"]
+    return ReportSpec(
+        filename=f"roster-{code}.csv",
+        header=render_header(ROSTER_HEADER),
+        render=render_roster,
+        chunks=[
+            (chunk, {uid: students[uid] for uid in {e["user_id"] for e in chunk} if uid in students})
+            for chunk in _chunked(rows, chunk_size)
+        ],
+    )
+
+
+def transcript_spec(student_id: int, chunk_size: int = REPORT_CHUNK_SIZE) -> ReportSpec:
+    """Transcript of every course a student is enrolled in. The caller checks the student exists."""
+    if shared_db is not None:
+        with shared_db.read():
+            rows = enrollments.for_student(student_id)
+            taken = courses.get_many({e["course_id"] for e in rows})
+    else:
+        with enrollments.lock_all():
+            rows = enrollments.for_student(student_id)
+        taken = {e["course_id"]: courses[e["course_id"]] for e in rows if e["course_id"] in courses}
+    return ReportSpec(
+        filename=f"transcript-{student_id}.csv",
+        header=render_header(TRANSCRIPT_HEADER),
+        render=render_transcript,
+        chunks=[
+            (chunk, {cid: taken[cid] for cid in {e["course_id"] for e in chunk} if cid in taken})
+            for chunk in _chunked(rows, chunk_size)
+        ],
+    )
@@ -1,10 +1,12 @@
 """Course management endpoints with role-based access."""
 
 from typing import Optional
-from fastapi import APIRouter, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 
+from app.compression import cache_by_version
 from app.data.store import courses, users, get_next_course_id
 from app.models.schemas import CourseCreate, CourseUpdate, CourseResponse
+from app.projection import fieldset, project
 
 router = APIRouter(prefix="/courses", tags=["Courses"])
 
@@ -29,18 +31,19 @@ def _check_code_unique(code: str, exclude_id: Optional[int] = None):
 
 # ── Public endpoints ─────────────────────────────────────────────────────────
 
-@router.get("/", response_model=list[CourseResponse])
-def get_all_courses():
+@router.get("/", response_model=list[CourseResponse], dependencies=[Depends(cache_by_version(courses))])
+def get_all_courses(fields: Optional[tuple] = Depends(fieldset(CourseResponse))):
     """Retrieve all courses (public)."""
-    return list(courses.values())
+    return project(list(courses.values()), fields)
 
 
 @router.get("/{course_id}", response_model=CourseResponse)
-def get_course(course_id: int):
+def get_course(course_id: int, fields: Optional[tuple] = Depends(fieldset(CourseResponse))):
     """Retrieve a course by ID (public)."""
-    if course_id not in courses:
+    course = courses.get(course_id)
+    if course is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
-    return courses[course_id]
+    return project(course, fields)
 
 
 # ── Admin-only endpoints ─────────────────────────────────────────────────────
@@ -67,13 +70,14 @@ def update_course(
     if course_id not in courses:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
 
-    existing = courses[course_id]
+    updated = dict(courses[course_id])
     if course.title is not None:
-        existing["title"] = course.title
+        updated["title"] = course.title
     if course.code is not None:
         _check_code_unique(course.code, exclude_id=course_id)
-        existing["code"] = course.code
-    return existing
+        updated["code"] = course.code
+    courses[course_id] = updated
+    return updated
 
 
 @router.delete("/{course_id}", status_code=status.HTTP_200_OK)
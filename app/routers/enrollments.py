@@ -1,9 +1,13 @@
 """Enrollment management endpoints."""
 
-from fastapi import APIRouter, HTTPException, Query, status
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 
-from app.data.store import enrollments, users, courses, get_next_enrollment_id
+from app.compression import cache_by_version, mark_cacheable
+from app.data.shards import DuplicateEnrollmentError
+from app.data.store import enrollments, users, courses
 from app.models.schemas import EnrollmentCreate, EnrollmentResponse
+from app.projection import fieldset, project
 
 router = APIRouter(prefix="/enrollments", tags=["Enrollments"])
 
@@ -37,22 +41,10 @@ def enroll_student(enrollment: EnrollmentCreate):
     if enrollment.course_id not in courses:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
 
-    # Check duplicate enrollment
-    for e in enrollments.values():
-        if e["user_id"] == enrollment.user_id and e["course_id"] == enrollment.course_id:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Student is already enrolled in this course",
-            )
-
-    enrollment_id = get_next_enrollment_id()
-    enrollment_data = {
-        "id": enrollment_id,
-        "user_id": enrollment.user_id,
-        "course_id": enrollment.course_id,
-    }
-    enrollments[enrollment_id] = enrollment_data
-    return enrollment_data
+    try:
+        return enrollments.add(enrollment.user_id, enrollment.course_id)
+    except DuplicateEnrollmentError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
 
 
 @router.delete("/{enrollment_id}", status_code=status.HTTP_200_OK)
@@ -63,47 +55,57 @@ def deregister_student(
     """Deregister a student from a course."""
     _verify_student(user_id)
 
-    if enrollment_id not in enrollments:
+    enrollment = enrollments.get(enrollment_id)
+    if enrollment is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Enrollment not found")
 
-    enrollment = enrollments[enrollment_id]
     if enrollment["user_id"] != user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Students can only deregister their own enrollments",
         )
 
-    del enrollments[enrollment_id]
+    if enrollments.remove(enrollment_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Enrollment not found")
     return {"detail": "Successfully deregistered from course"}
 
 
 @router.get("/student/{student_id}", response_model=list[EnrollmentResponse])
-def get_student_enrollments(student_id: int):
+def get_student_enrollments(
+    student_id: int,
+    fields: Optional[tuple] = Depends(fieldset(EnrollmentResponse)),
+):
     """Retrieve all enrollments for a specific student."""
     if student_id not in users:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-    return [e for e in enrollments.values() if e["user_id"] == student_id]
+    return project(enrollments.for_student(student_id), fields)
 
 
 # ── Admin Enrollment Oversight ───────────────────────────────────────────────
 
-@router.get("/", response_model=list[EnrollmentResponse])
-def get_all_enrollments(user_id: int = Query(..., description="ID of the admin user")):
+@router.get("/", response_model=list[EnrollmentResponse], dependencies=[Depends(cache_by_version(enrollments))])
+def get_all_enrollments(
+    user_id: int = Query(..., description="ID of the admin user"),
+    fields: Optional[tuple] = Depends(fieldset(EnrollmentResponse)),
+):
     """Retrieve all enrollments (admin only)."""
     _verify_admin(user_id)
-    return list(enrollments.values())
+    return project(enrollments.all(), fields)
 
 
 @router.get("/course/{course_id}", response_model=list[EnrollmentResponse])
 def get_course_enrollments(
+    request: Request,
     course_id: int,
     user_id: int = Query(..., description="ID of the admin user"),
+    fields: Optional[tuple] = Depends(fieldset(EnrollmentResponse)),
 ):
     """Retrieve all enrollments for a specific course (admin only)."""
+    mark_cacheable(request, enrollments.course_version(course_id))
     _verify_admin(user_id)
     if course_id not in courses:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
-    return [e for e in enrollments.values() if e["course_id"] == course_id]
+    return project(enrollments.for_course(course_id), fields)
 
 
 @router.delete("/admin/{enrollment_id}", status_code=status.HTTP_200_OK)
@@ -113,7 +115,6 @@ def admin_force_deregister(
 ):
     """Force deregister a student from a course (admin only)."""
     _verify_admin(user_id)
-    if enrollment_id not in enrollments:
+    if enrollments.remove(enrollment_id) is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Enrollment not found")
-    del enrollments[enrollment_id]
     return {"detail": "Student force-deregistered from course"}
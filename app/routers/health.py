@@ -0,0 +1,28 @@
+"""Worker health, readiness and boot timing endpoints."""
+
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+
+from app import startup
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+
+@router.get("/ready")
+def readiness():
+    """Return 200 once the worker has booted (and warmed up), 503 otherwise.
+
+    Readiness is set at the end of lifespan startup, and servers such as
+    uvicorn only accept connections after that, so over HTTP a worker reports
+    503 only once lifespan shutdown has begun. A worker that is still booting
+    refuses the connection instead; probes should treat that as not ready.
+    """
+    if not startup.ready:
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content={"status": "starting"})
+    return {"status": "ready"}
+
+
+@router.get("/startup")
+def startup_report():
+    """Boot timing breakdown: import, app construction, warm-up and first request (ms)."""
+    return startup.report()
@@ -0,0 +1,90 @@
+"""Background report generation endpoints (admin only)."""
+
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse
+
+from app.data.store import users, courses
+from app.models.schemas import ReportJobResponse, ReportKindEnum
+from app.projection import fieldset, project
+from app.reports.jobs import JobQueueFullError, ReportJob, manager
+from app.reports.sources import roster_spec, transcript_spec
+
+router = APIRouter(prefix="/reports", tags=["Reports"])
+
+
+def _verify_admin(user_id: int):
+    """Verify that the user exists and is an admin."""
+    if user_id not in users:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    if users[user_id]["role"] != "admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only admins can perform this action")
+
+
+def _get_job(job_id: str) -> ReportJob:
+    job = manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Report job not found")
+    return job
+
+
+def _job_response(job: ReportJob) -> dict:
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "progress": job.progress,
+        "error": job.error,
+    }
+
+
+@router.post("/{kind}", response_model=ReportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+def create_report(
+    kind: ReportKindEnum,
+    user_id: int = Query(..., description="ID of the admin user"),
+    course_id: Optional[int] = Query(None, description="Course to build a roster for"),
+    student_id: Optional[int] = Query(None, description="Student to build a transcript for"),
+):
+    """Start generating a report and return its job immediately (admin only)."""
+    _verify_admin(user_id)
+    if kind == ReportKindEnum.roster:
+        if course_id is None:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_CONTENT, detail="course_id is required")
+        if course_id not in courses:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
+        key, build = (course_id,), lambda: roster_spec(course_id)
+    else:
+        if student_id is None:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_CONTENT, detail="student_id is required")
+        if student_id not in users:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+        key, build = (student_id,), lambda: transcript_spec(student_id)
+
+    try:
+        job = manager.submit(kind.value, key, build)
+    except JobQueueFullError as exc:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(exc))
+    return _job_response(job)
+
+
+@router.get("/jobs/{job_id}", response_model=ReportJobResponse)
+def get_report_job(
+    job_id: str,
+    user_id: int = Query(..., description="ID of the admin user"),
+    fields: Optional[tuple] = Depends(fieldset(ReportJobResponse)),
+):
+    """Report the status and progress of a report job (admin only)."""
+    _verify_admin(user_id)
+    return project(_job_response(_get_job(job_id)), fields)
+
+
+@router.get("/jobs/{job_id}/result")
+def get_report_result(job_id: str, user_id: int = Query(..., description="ID of the admin user")):
+    """Stream a finished report file (admin only)."""
+    _verify_admin(user_id)
+    job = _get_job(job_id)
+    if job.status == "failed":
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Report generation failed: {job.error}")
+    if job.status != "completed":
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Report is not ready yet")
+    return FileResponse(job.path, media_type="text/csv", filename=job.filename)
@@ -1,9 +1,12 @@
 """User management endpoints."""
 
-from fastapi import APIRouter, HTTPException, status
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status
 
+from app.compression import cache_by_version
 from app.data.store import users, get_next_user_id
 from app.models.schemas import UserCreate, UserResponse
+from app.projection import fieldset, project
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -17,15 +20,16 @@ def create_user(user: UserCreate):
     return user_data
 
 
-@router.get("/", response_model=list[UserResponse])
-def get_all_users():
+@router.get("/", response_model=list[UserResponse], dependencies=[Depends(cache_by_version(users))])
+def get_all_users(fields: Optional[tuple] = Depends(fieldset(UserResponse))):
     """Retrieve all users."""
-    return list(users.values())
+    return project(list(users.values()), fields)
 
 
 @router.get("/{user_id}", response_model=UserResponse)
-def get_user(user_id: int):
+def get_user(user_id: int, fields: Optional[tuple] = Depends(fieldset(UserResponse))):
     """Retrieve a user by ID."""
-    if user_id not in users:
+    user = users.get(user_id)
+    if user is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-    return users[user_id]
+    return project(user, fields)
@@ -0,0 +1,194 @@
+"""Capture of sanitized request traces for production-shaped load tests.
+
+``TrafficCaptureMiddleware`` appends one compact JSON line per request to a
+JSON lines file: the wall-clock time, method, route template, path and query
+parameters, JSON body, status and server-side duration. Headers are never
+recorded and personal data in bodies is replaced with deterministic
+placeholders, so traces can be shared and replayed with
+``python -m benchmarks.replay``.
+
+Every worker process may append to the same file: lines are buffered and
+written as whole lines with a single ``os.write`` on an ``O_APPEND``
+descriptor, so records from different processes never interleave.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from typing import Iterator, Optional
+from urllib.parse import parse_qsl
+
+from starlette.datastructures import Headers
+
+from app.startup import PROBE_PREFIX, WARMUP_SCOPE_KEY
+
+# Body fields holding personal data, and how to replace them.
+_SANITIZERS = {
+    "name": lambda value: f"User {_digest(value)}",
+    "email": lambda value: f"user-{_digest(value)}@example.com",
+}
+# Bodies larger than this are recorded without their content.
+_MAX_BODY = 64 * 1024
+# Buffered trace bytes that trigger an immediate write.
+_FLUSH_BYTES = 64 * 1024
+
+
+def _digest(value) -> str:
+    return hashlib.blake2s(str(value).encode(), digest_size=4).hexdigest()
+
+
+def sanitize(body):
+    """Replace personal data in a JSON body, keeping its shape and validity."""
+    if isinstance(body, dict):
+        return {
+            key: _SANITIZERS[key](value) if key in _SANITIZERS else sanitize(value)
+            for key, value in body.items()
+        }
+    if isinstance(body, list):
+        return [sanitize(item) for item in body]
+    return body
+
+
+class TraceWriter:
+    """Thread-safe appender of trace records to a JSON lines file.
+
+    Records are buffered and written every ``flush_interval`` seconds, when
+    the buffer passes ``_FLUSH_BYTES``, and on ``close()``.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 1.0):
+        self.path = path
+        self._fd: Optional[int] = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._lock = threading.Lock()
+        self._buffer: list[bytes] = []
+        self._buffered = 0
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(
+            target=self._flush_periodically, args=(flush_interval,), name="trace-flusher", daemon=True
+        )
+        self._flusher.start()
+
+    def write(self, record: dict):
+        line = (json.dumps(record, separators=(",", ":")) + "\n").encode()
+        with self._lock:
+            if self._fd is None:
+                return
+            self._buffer.append(line)
+            self._buffered += len(line)
+            if self._buffered >= _FLUSH_BYTES:
+                self._flush()
+
+    def flush(self):
+        with self._lock:
+            if self._fd is not None:
+                self._flush()
+
+    def close(self):
+        self._stop.set()
+        if self._flusher is not threading.current_thread():
+            self._flusher.join()
+        with self._lock:
+            if self._fd is not None:
+                self._flush()
+                os.close(self._fd)
+                self._fd = None
+
+    def _flush(self):
+        """Append buffered lines in one write. Caller holds ``_lock``."""
+        if self._buffer:
+            data = b"".join(self._buffer)
+            self._buffer.clear()
+            self._buffered = 0
+            # A single write to an O_APPEND descriptor lands contiguously at the end.
+            written = os.write(self._fd, data)
+            while written < len(data):
+                data = data[written:]
+                written = os.write(self._fd, data)
+
+    def _flush_periodically(self, interval: float):
+        while not self._stop.wait(interval):
+            self.flush()
+
+
+def read_traces(path: str) -> Iterator[dict]:
+    """Yield trace records, ignoring a final line cut short by a crash.
+
+    Gzip-compressed trace files are read as well.
+    """
+    with open(path, "rb") as raw:
+        compressed = raw.read(2) == b"\x1f\x8b"
+    opener = gzip.open if compressed else open
+    with opener(path, "rt", encoding="utf-8", errors="replace") as fh:
+        try:
+            for line in fh:
+                if not line.endswith("\n"):
+                    return
+                if line.strip():
+                    yield json.loads(line)
+        except EOFError:
+            # Truncated gzip stream; everything before it has been yielded.
+            return
+
+
+class TrafficCaptureMiddleware:
+    def __init__(self, app, writer: TraceWriter, sample: float = 1.0):
+        self.app = app
+        self.writer = writer
+        self.sample = sample
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope.get(WARMUP_SCOPE_KEY)
+            or scope["path"].startswith(PROBE_PREFIX)
+            or (self.sample < 1.0 and random.random() >= self.sample)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        wall_clock, started = time.time(), time.monotonic()
+        chunks: list[bytes] = []
+        status_code: Optional[int] = None
+
+        async def receive_and_record():
+            message = await receive()
+            if message["type"] == "http.request":
+                chunks.append(message.get("body", b""))
+            return message
+
+        async def send_and_record(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive_and_record, send_and_record)
+        finally:
+            route = scope.get("route")
+            self.writer.write({
+                "t": round(wall_clock, 6),
+                "m": scope["method"],
+                "r": route.path if route is not None else scope["path"],
+                "p": scope.get("path_params") or {},
+                "q": parse_qsl(scope.get("query_string", b"").decode("latin-1")),
+                "b": _json_body(scope, chunks),
+                "s": status_code or 500,
+                "d": round((time.monotonic() - started) * 1000, 3),
+            })
+
+
+def _json_body(scope, chunks: list[bytes]):
+    body = b"".join(chunks)
+    if not body or len(body) > _MAX_BODY:
+        return None
+    if "json" not in Headers(scope=scope).get("content-type", ""):
+        return None
+    try:
+        return sanitize(json.loads(body))
+    except ValueError:
+        return None
@@ -0,0 +1,69 @@
+"""Cold-start time of a worker, checked against a time budget.
+
+Run with ``python -m benchmarks.bench_cold_start``. Each run boots a fresh
+interpreter that imports ``app.main``, runs the lifespan startup (including
+warm-up unless ``STARTUP_WARMUP=0``) and serves one request, then reports the
+per-phase timings. Exits non-zero if the median time to ready exceeds the
+budget, so it can gate CI.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+_CHILD = """
+import asyncio, json
+from app.main import app
+from app import startup
+
+async def boot():
+    async with app.router.lifespan_context(app):
+        await startup.asgi_request(app, "GET", "/courses/")
+        print(json.dumps(startup.timings))
+
+asyncio.run(boot())
+"""
+
+
+def cold_start(warmup: bool = True) -> dict:
+    """Boot one fresh worker process and return its phase timings plus wall time (ms)."""
+    env = dict(os.environ, STARTUP_WARMUP="1" if warmup else "0")
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", _CHILD], env=env, check=True, capture_output=True, text=True
+    ).stdout
+    wall = (time.perf_counter() - started) * 1000
+    timings = json.loads(output.strip().splitlines()[-1])
+    timings["ready"] = timings["import"] + timings["app"] + timings.get("warmup", 0.0)
+    timings["process_wall"] = wall
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1500.0, help="budget for median time to ready")
+    args = parser.parse_args()
+
+    phases = ["import", "app", "warmup", "ready", "first_request", "process_wall"]
+    print(f"median of {args.runs} cold starts (ms)")
+    print(f"  {'warm-up':<8}" + "".join(f"{phase:>14}" for phase in phases))
+    medians = {}
+    for warmup in (False, True):
+        runs = [cold_start(warmup) for _ in range(args.runs)]
+        medians[warmup] = {phase: statistics.median(run.get(phase, 0.0) for run in runs) for phase in phases}
+        print(f"  {'on' if warmup else 'off':<8}" + "".join(f"{medians[warmup][phase]:>14.1f}" for phase in phases))
+
+    ready = medians[True]["ready"]
+    print(f"time to ready {ready:.1f} ms, budget {args.budget_ms:.0f} ms")
+    if ready > args.budget_ms:
+        print("OVER BUDGET")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
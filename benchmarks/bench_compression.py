@@ -0,0 +1,57 @@
+"""CPU cost versus bytes saved for response compression.
+
+Run with ``python -m benchmarks.bench_compression``. Builds a ``GET /courses/``
+style JSON body, then reports compression time, output size and savings for
+each encoding and level, alongside the cost of serving from the body cache.
+"""
+
+import argparse
+import json
+import time
+
+from app.compression import ENCODINGS, CompressedBodyCache, compress
+
+
+def course_list_body(rows: int) -> bytes:
+    return json.dumps(
+        [{"id": i, "title": f"Introduction to Topic {i}", "code": f"CS{i:06d}"} for i in range(1, rows + 1)],
+        separators=(",", ":"),
+    ).encode()
+
+
+def timed(func, repeat: int) -> float:
+    """Best-of-``repeat`` wall time in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 6, 9])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    body = course_list_body(args.rows)
+    print(f"{args.rows} courses, {len(body) / 1024:,.0f} KiB uncompressed")
+    print(f"  {'encoding':<8} {'level':>5} {'ms':>8} {'KiB':>9} {'saved':>7} {'MiB/s':>8}")
+    for encoding in ENCODINGS:
+        for level in args.levels:
+            compressed = compress(body, encoding, level)
+            seconds = timed(lambda: compress(body, encoding, level), args.repeat)
+            saved = 1 - len(compressed) / len(body)
+            print(f"  {encoding:<8} {level:>5} {seconds * 1000:>8.2f} {len(compressed) / 1024:>9,.0f} "
+                  f"{saved:>6.1%} {len(body) / seconds / 2**20:>8,.0f}")
+
+    cache = CompressedBodyCache()
+    cache.put(("/courses/", "", 1, "gzip", 6), compress(body, "gzip", 6))
+    seconds = timed(lambda: cache.get(("/courses/", "", 1, "gzip", 6)), args.repeat)
+    print(f"  cached hit: {seconds * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
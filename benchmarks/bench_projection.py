@@ -0,0 +1,64 @@
+"""Payload size and latency of sparse fieldsets at 100k rows.
+
+Run with ``python -m benchmarks.bench_projection``. Fills the store with
+courses and enrollments, then times ``GET /courses/`` and
+``GET /enrollments/student/{id}`` in-process with and without ``fields=``.
+"""
+
+import argparse
+import statistics
+import time
+
+from fastapi.testclient import TestClient
+
+from app.data.store import courses, enrollments, get_next_course_id, reset_store, users
+from app.main import app
+
+
+def populate(rows: int) -> int:
+    """Create ``rows`` courses and enroll one student in all of them. Returns the student id."""
+    reset_store()
+    users[1] = {"id": 1, "name": "Bench Student", "email": "bench@example.com", "role": "student"}
+    for i in range(rows):
+        course_id = get_next_course_id()
+        courses[course_id] = {"id": course_id, "title": f"Introduction to Topic {i}", "code": f"CS{i:06d}"}
+        enrollments.add(user_id=1, course_id=course_id)
+    return 1
+
+
+def measure(client: TestClient, url: str, params: dict, repeat: int) -> tuple[float, int]:
+    """Median latency in ms and response size in bytes."""
+    timings = []
+    size = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.get(url, params=params, headers={"Accept-Encoding": "identity"})
+        timings.append((time.perf_counter() - started) * 1000)
+        size = len(response.content)
+    return statistics.median(timings), size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    student_id = populate(args.rows)
+    client = TestClient(app)
+    cases = [
+        ("/courses/", {}),
+        ("/courses/", {"fields": "id,code"}),
+        ("/courses/", {"fields": "id"}),
+        (f"/enrollments/student/{student_id}", {}),
+        (f"/enrollments/student/{student_id}", {"fields": "course_id"}),
+    ]
+    print(f"{args.rows:,} rows, median of {args.repeat}")
+    print(f"  {'endpoint':<28} {'fields':<12} {'ms':>9} {'KiB':>9}")
+    for url, params in cases:
+        ms, size = measure(client, url, params, args.repeat)
+        print(f"  {url:<28} {params.get('fields', '(all)'):<12} {ms:>9.1f} {size / 1024:>9,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Multi-threaded enrollment write throughput versus shard count.
+
+Run with ``python -m benchmarks.bench_sharded_store``. On a free-threaded
+CPython build (``python3.13t`` or later with the GIL disabled) writers to
+different shards run truly in parallel and throughput should scale with the
+shard count; with the GIL enabled the numbers mostly show lock overhead.
+"""
+
+import argparse
+import sys
+import threading
+import time
+
+from app.data.shards import ShardedEnrollmentStore
+
+
+def gil_enabled() -> bool:
+    check = getattr(sys, "_is_gil_enabled", None)
+    return True if check is None else check()
+
+
+def run(num_shards: int, threads: int, writes_per_thread: int) -> float:
+    """Return enrollment writes per second for one configuration."""
+    store = ShardedEnrollmentStore(num_shards)
+    start_barrier = threading.Barrier(threads + 1)
+
+    def writer(worker: int):
+        start_barrier.wait()
+        # Each thread enrolls students into its own course, the common
+        # registration-week pattern of many courses filling at once.
+        course_id = worker + 1
+        for user_id in range(1, writes_per_thread + 1):
+            store.add(user_id=user_id, course_id=course_id)
+
+    pool = [threading.Thread(target=writer, args=(i,)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    start_barrier.wait()
+    started = time.perf_counter()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - started
+    assert len(store) == threads * writes_per_thread
+    return threads * writes_per_thread / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--writes", type=int, default=20_000, help="writes per thread")
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    print(f"Python {sys.version.split()[0]}, GIL {'enabled' if gil_enabled() else 'disabled'}, "
+          f"{args.threads} threads x {args.writes} writes")
+    baseline = None
+    for num_shards in args.shards:
+        rate = run(num_shards, args.threads, args.writes)
+        baseline = baseline or rate
+        print(f"  shards={num_shards:<3} {rate:>12,.0f} writes/s  ({rate / baseline:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Request throughput of the shared store from 1 to N uvicorn workers.
+
+Run with ``python -m benchmarks.bench_workers``. For each worker count it
+starts ``uvicorn app.main:app --workers N`` with ``STORE_PATH`` pointing at a
+fresh SQLite file, seeds courses and students, then drives a
+registration-week mix (80% ``GET /courses/``, 15% ``POST /enrollments/``, 5%
+admin ``GET /enrollments/course/{id}``) from several client processes and
+reports requests per second and latency percentiles.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import httpx
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start(workers: int, store_path: str) -> tuple[subprocess.Popen, str]:
+    port = _free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        env=dict(os.environ, STORE_PATH=store_path),
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{url}/health/ready").status_code == 200:
+                return proc, url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("server did not become ready")
+
+
+def _seed(url: str, courses: int, students: int) -> tuple[int, list[int], list[int]]:
+    with httpx.Client(base_url=url) as client:
+        admin = client.post("/users/", json={"name": "Admin", "email": "admin@example.com", "role": "admin"}).json()
+        course_ids = [
+            client.post("/courses/", json={"title": f"Course {i}", "code": f"B{i:05d}"},
+                        params={"user_id": admin["id"]}).json()["id"]
+            for i in range(courses)
+        ]
+        student_ids = [
+            client.post("/users/", json={"name": f"S{i}", "email": f"s{i}@example.com", "role": "student"}).json()["id"]
+            for i in range(students)
+        ]
+    return admin["id"], course_ids, student_ids
+
+
+def _client_load(url: str, seconds: float, concurrency: int, admin_id: int, course_ids, student_ids) -> list[float]:
+    """Run the request mix from one client process; return latencies in ms."""
+
+    async def run() -> list[float]:
+        latencies: list[float] = []
+        deadline = time.perf_counter() + seconds
+        limits = httpx.Limits(max_connections=concurrency)
+        async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30.0) as client:
+
+            async def worker():
+                rng = random.Random()
+                while time.perf_counter() < deadline:
+                    roll = rng.random()
+                    started = time.perf_counter()
+                    if roll < 0.80:
+                        await client.get("/courses/")
+                    elif roll < 0.95:
+                        body = {"user_id": rng.choice(student_ids), "course_id": rng.choice(course_ids)}
+                        await client.post("/enrollments/", json=body)
+                    else:
+                        await client.get(f"/enrollments/course/{rng.choice(course_ids)}",
+                                         params={"user_id": admin_id})
+                    latencies.append((time.perf_counter() - started) * 1000)
+
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return latencies
+
+    return asyncio.run(run())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--clients", type=int, default=4, help="client processes generating load")
+    parser.add_argument("--concurrency", type=int, default=16, help="in-flight requests per client")
+    parser.add_argument("--courses", type=int, default=50)
+    parser.add_argument("--students", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{args.clients} clients x {args.concurrency} concurrent, {args.seconds:.0f}s per run, cpus={os.cpu_count()}")
+    print(f"  {'workers':>7} {'req/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'speedup':>8}")
+    baseline = None
+    for workers in args.workers:
+        with tempfile.TemporaryDirectory() as tmp:
+            proc, url = _start(workers, os.path.join(tmp, "store.db"))
+            try:
+                admin_id, course_ids, student_ids = _seed(url, args.courses, args.students)
+                with ProcessPoolExecutor(max_workers=args.clients) as pool:
+                    futures = [
+                        pool.submit(_client_load, url, args.seconds, args.concurrency,
+                                    admin_id, course_ids, student_ids)
+                        for _ in range(args.clients)
+                    ]
+                    latencies = sorted(lat for future in futures for lat in future.result())
+            finally:
+                proc.terminate()
+                proc.wait(timeout=30)
+        rate = len(latencies) / args.seconds
+        baseline = baseline or rate
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        print(f"  {workers:>7} {rate:>10,.0f} {statistics.median(latencies):>8.1f} {p99:>8.1f} "
+              f"{rate / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
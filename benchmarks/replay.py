@@ -0,0 +1,162 @@
+"""Replay captured traffic against the API and report latency per route.
+
+Traces are recorded by setting ``TRAFFIC_CAPTURE_PATH`` on a running server
+(see ``app/traffic.py``). Examples::
+
+    python -m benchmarks.replay traces.jsonl                   # in-process, original speed
+    python -m benchmarks.replay traces.jsonl --speed 10        # 10x accelerated
+    python -m benchmarks.replay traces.jsonl --concurrency 32  # fixed concurrency, no pacing
+    python -m benchmarks.replay traces.jsonl --target http://127.0.0.1:8000
+
+In-process replays start from an empty store; ``--seed-students`` and
+``--seed-courses`` pre-populate it so id-based routes resolve.
+"""
+
+import argparse
+import asyncio
+import math
+import re
+import time
+from collections import defaultdict
+from typing import Optional
+
+import httpx
+
+from app.traffic import read_traces
+
+_PARAM = re.compile(r"{(\w+)(?::\w+)?}")
+
+
+def build_request(trace: dict) -> tuple[str, str, list, Optional[object]]:
+    """Turn a trace record back into (method, path, query params, JSON body)."""
+    params = trace.get("p", {})
+    path = _PARAM.sub(lambda m: str(params.get(m.group(1), m.group(0))), trace["r"])
+    return trace["m"], path, trace.get("q", []), trace.get("b")
+
+
+async def replay(
+    traces: list[dict],
+    client: httpx.AsyncClient,
+    speed: float = 1.0,
+    concurrency: Optional[int] = None,
+) -> dict[str, list[tuple[float, int]]]:
+    """Send every trace and collect (latency ms, status) per route.
+
+    With ``concurrency`` set, that many workers send requests back to back;
+    otherwise requests keep their captured spacing divided by ``speed``
+    (``math.inf`` sends everything at once). Transport errors count as status 0.
+    """
+    results: dict[str, list[tuple[float, int]]] = defaultdict(list)
+
+    async def send(trace: dict):
+        method, path, query, body = build_request(trace)
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, path, params=query, json=body)
+            status_code = response.status_code
+        except httpx.HTTPError:
+            status_code = 0
+        results[f"{method} {trace['r']}"].append(((time.perf_counter() - started) * 1000, status_code))
+
+    traces = sorted(traces, key=lambda trace: trace["t"])
+    if concurrency:
+        queue: asyncio.Queue = asyncio.Queue()
+        for trace in traces:
+            queue.put_nowait(trace)
+
+        async def worker():
+            while not queue.empty():
+                await send(queue.get_nowait())
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return results
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    first = traces[0]["t"] if traces else 0.0
+    pending = []
+    for trace in traces:
+        delay = start + (trace["t"] - first) / speed - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        pending.append(asyncio.create_task(send(trace)))
+    await asyncio.gather(*pending)
+    return results
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(results: dict[str, list[tuple[float, int]]]) -> list[dict]:
+    rows = []
+    for route, samples in sorted(results.items(), key=lambda item: -len(item[1])):
+        latencies = sorted(latency for latency, _ in samples)
+        rows.append({
+            "route": route,
+            "count": len(samples),
+            "errors": sum(1 for _, status_code in samples if status_code == 0 or status_code >= 500),
+            "p50": percentile(latencies, 50),
+            "p90": percentile(latencies, 90),
+            "p99": percentile(latencies, 99),
+            "max": latencies[-1],
+        })
+    return rows
+
+
+def seed(students: int, courses_count: int):
+    """Populate the in-process store: user 1 is an admin, users 2.. are students."""
+    from app.data.store import courses, get_next_course_id, get_next_user_id, users
+
+    for n in range(students + 1):
+        user_id = get_next_user_id()
+        role = "admin" if n == 0 else "student"
+        users[user_id] = {"id": user_id, "name": f"User {user_id}", "email": f"u{user_id}@example.com", "role": role}
+    for _ in range(courses_count):
+        course_id = get_next_course_id()
+        courses[course_id] = {"id": course_id, "title": f"Course {course_id}", "code": f"C{course_id:06d}"}
+
+
+def _client(target: Optional[str]) -> httpx.AsyncClient:
+    if target:
+        return httpx.AsyncClient(base_url=target, timeout=30.0)
+    from app.main import app
+
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://replay")
+
+
+async def _run(args) -> list[dict]:
+    traces = list(read_traces(args.traces))
+    async with _client(args.target) as client:
+        started = time.perf_counter()
+        results = await replay(traces, client, speed=args.speed, concurrency=args.concurrency)
+        elapsed = time.perf_counter() - started
+    print(f"{len(traces)} requests in {elapsed:.2f}s ({len(traces) / max(elapsed, 1e-9):,.0f} req/s)")
+    return summarize(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("traces", help="trace file written by TRAFFIC_CAPTURE_PATH")
+    parser.add_argument("--target", help="base URL of a running server (default: in-process app)")
+    parser.add_argument("--speed", type=float, default=1.0, help="pacing multiplier; 'inf' for no pacing")
+    parser.add_argument("--concurrency", type=int, help="fixed number of concurrent senders, ignores pacing")
+    parser.add_argument("--seed-students", type=int, default=0)
+    parser.add_argument("--seed-courses", type=int, default=0)
+    args = parser.parse_args()
+
+    if not args.target:
+        seed(args.seed_students, args.seed_courses)
+    rows = asyncio.run(_run(args))
+    print(f"  {'route':<40} {'count':>7} {'errors':>6} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for row in rows:
+        print(f"  {row['route']:<40} {row['count']:>7} {row['errors']:>6} {row['p50']:>8.2f} "
+              f"{row['p90']:>8.2f} {row['p99']:>8.2f} {row['max']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
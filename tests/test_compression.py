@@ -0,0 +1,168 @@
+"""Tests for response compression and the compressed body cache."""
+
+import gzip
+import zlib
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import FileResponse, PlainTextResponse
+from fastapi.testclient import TestClient
+
+from app.compression import CompressedBodyCache, CompressionMiddleware, cache, negotiate
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def many_courses(client, admin_user):
+    for i in range(40):
+        client.post(
+            "/courses/",
+            json={"title": f"Course number {i}", "code": f"C{i:03d}"},
+            params={"user_id": admin_user["id"]},
+        )
+
+
+def _raw_get(client, url, encoding, **kwargs):
+    """GET without letting the client transparently decode the body."""
+    with client.stream("GET", url, headers={"Accept-Encoding": encoding}, **kwargs) as response:
+        return response, b"".join(response.iter_raw())
+
+
+class TestNegotiation:
+    def test_prefers_gzip(self):
+        assert negotiate("deflate, gzip") == "gzip"
+
+    def test_respects_quality(self):
+        assert negotiate("gzip;q=0.2, deflate") == "deflate"
+        assert negotiate("gzip;q=0, deflate;q=0") is None
+
+    def test_wildcard_and_unknown(self):
+        assert negotiate("*") == "gzip"
+        assert negotiate("br") is None
+        assert negotiate("") is None
+
+
+class TestCompressedResponses:
+    def test_gzip(self, client, many_courses):
+        response, raw = _raw_get(client, "/courses/", "gzip")
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert int(response.headers["content-length"]) == len(raw)
+        assert len(gzip.decompress(raw)) > len(raw)
+
+    def test_deflate(self, client, many_courses):
+        response, raw = _raw_get(client, "/courses/", "deflate")
+        assert response.headers["content-encoding"] == "deflate"
+        assert zlib.decompress(raw).startswith(b"[")
+
+    def test_identity_when_not_accepted(self, client, many_courses):
+        response, raw = _raw_get(client, "/courses/", "identity")
+        assert "content-encoding" not in response.headers
+        assert raw.startswith(b"[")
+
+    def test_small_body_not_compressed(self, client, sample_course):
+        response, _ = _raw_get(client, "/courses/", "gzip")
+        assert "content-encoding" not in response.headers
+
+    def test_client_sees_same_json(self, client, many_courses):
+        compressed = client.get("/courses/", headers={"Accept-Encoding": "gzip"})
+        plain = client.get("/courses/", headers={"Accept-Encoding": "identity"})
+        assert compressed.json() == plain.json()
+
+    def test_already_encoded_passes_through(self):
+        app = FastAPI()
+        app.add_middleware(CompressionMiddleware, minimum_size=1)
+
+        @app.get("/text")
+        def text():
+            return PlainTextResponse("x" * 100, headers={"Content-Encoding": "br"})
+
+        response = TestClient(app).get("/text", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "br"
+
+
+    def test_partial_content_passes_through(self, tmp_path):
+        path = tmp_path / "report.csv"
+        path.write_text("id,name\n" * 2000)
+        app = FastAPI()
+        app.add_middleware(CompressionMiddleware, minimum_size=1)
+
+        @app.get("/file")
+        def file():
+            return FileResponse(path)
+
+        client = TestClient(app)
+        headers = {"Accept-Encoding": "gzip", "Range": "bytes=0-4999"}
+        with client.stream("GET", "/file", headers=headers) as response:
+            raw = b"".join(response.iter_raw())
+        assert response.status_code == 206
+        assert "content-encoding" not in response.headers
+        assert response.headers["content-range"].startswith("bytes 0-4999/")
+        assert raw == path.read_bytes()[:5000]
+
+    def test_compressed_etag_differs_from_identity(self, tmp_path):
+        path = tmp_path / "report.csv"
+        path.write_text("id,name\n" * 2000)
+        app = FastAPI()
+        app.add_middleware(CompressionMiddleware, minimum_size=1)
+
+        @app.get("/file")
+        def file():
+            return FileResponse(path)
+
+        client = TestClient(app)
+        plain, _ = _raw_get(client, "/file", "identity")
+        compressed, _ = _raw_get(client, "/file", "gzip")
+        assert compressed.headers["content-encoding"] == "gzip"
+        assert compressed.headers["etag"] == plain.headers["etag"][:-1] + '-gzip"'
+
+
+class TestCompressedBodyCache:
+    def test_repeated_requests_hit_cache(self, client, many_courses):
+        _raw_get(client, "/courses/", "gzip")
+        _, raw = _raw_get(client, "/courses/", "gzip")
+        assert cache.hits == 1
+        assert gzip.decompress(raw).count(b'"code"') == 40
+
+    def test_write_invalidates(self, client, admin_user, many_courses):
+        _raw_get(client, "/courses/", "gzip")
+        client.post(
+            "/courses/",
+            json={"title": "One more", "code": "NEW1"},
+            params={"user_id": admin_user["id"]},
+        )
+        _, raw = _raw_get(client, "/courses/", "gzip")
+        assert cache.hits == 0
+        assert b"NEW1" in gzip.decompress(raw)
+
+    def test_update_invalidates(self, client, admin_user, many_courses):
+        _raw_get(client, "/courses/", "gzip")
+        client.put("/courses/1", json={"title": "Renamed"}, params={"user_id": admin_user["id"]})
+        _, raw = _raw_get(client, "/courses/", "gzip")
+        assert b"Renamed" in gzip.decompress(raw)
+
+    def test_encodings_cached_separately(self, client, many_courses):
+        _raw_get(client, "/courses/", "gzip")
+        response, raw = _raw_get(client, "/courses/", "deflate")
+        assert response.headers["content-encoding"] == "deflate"
+        assert cache.hits == 0
+        zlib.decompress(raw)
+
+    def test_errors_not_cached(self, client, student_user):
+        client.get("/enrollments/", params={"user_id": student_user["id"]})
+        assert cache.size == 0
+
+    def test_eviction_bounded_by_bytes(self):
+        small = CompressedBodyCache(max_bytes=10)
+        small.put(("a",), b"12345")
+        small.put(("b",), b"12345")
+        small.put(("c",), b"12345")
+        assert small.get(("a",)) is None
+        assert small.get(("c",)) == b"12345"
+        assert small.size == 10
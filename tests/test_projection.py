@@ -0,0 +1,65 @@
+"""Tests for sparse fieldsets (``?fields=``)."""
+
+from app.projection import compile_projection
+
+
+class TestFieldsets:
+    def test_courses_projection(self, client, sample_course):
+        response = client.get("/courses/", params={"fields": "id,code"})
+        assert response.status_code == 200
+        assert response.json() == [{"id": sample_course["id"], "code": "CS101"}]
+
+    def test_fields_returned_in_schema_order(self, client, sample_course):
+        response = client.get(f"/courses/{sample_course['id']}", params={"fields": "code, id"})
+        assert list(response.json()) == ["id", "code"]
+
+    def test_single_user_projection(self, client, student_user):
+        response = client.get(f"/users/{student_user['id']}", params={"fields": "role"})
+        assert response.json() == {"role": "student"}
+
+    def test_users_projection(self, client, admin_user, student_user):
+        response = client.get("/users/", params={"fields": "email"})
+        assert response.json() == [{"email": "admin@example.com"}, {"email": "student@example.com"}]
+
+    def test_student_enrollments_projection(self, client, student_user, sample_course):
+        client.post("/enrollments/", json={"user_id": student_user["id"], "course_id": sample_course["id"]})
+        response = client.get(f"/enrollments/student/{student_user['id']}", params={"fields": "course_id"})
+        assert response.json() == [{"course_id": sample_course["id"]}]
+
+    def test_admin_enrollment_projections(self, client, admin_user, student_user, sample_course):
+        client.post("/enrollments/", json={"user_id": student_user["id"], "course_id": sample_course["id"]})
+        params = {"user_id": admin_user["id"], "fields": "user_id"}
+        assert client.get("/enrollments/", params=params).json() == [{"user_id": student_user["id"]}]
+        course = client.get(f"/enrollments/course/{sample_course['id']}", params=params)
+        assert course.json() == [{"user_id": student_user["id"]}]
+
+    def test_all_fields_uses_full_response(self, client, sample_course):
+        response = client.get("/courses/", params={"fields": "id,title,code"})
+        assert response.json() == [sample_course]
+
+    def test_unknown_field_rejected(self, client, sample_course):
+        response = client.get("/courses/", params={"fields": "id,password"})
+        assert response.status_code == 422
+        assert "password" in response.json()["detail"]
+
+    def test_empty_fields_rejected(self, client):
+        response = client.get("/courses/", params={"fields": " , "})
+        assert response.status_code == 422
+
+    def test_projection_still_checks_access(self, client, student_user):
+        response = client.get("/enrollments/", params={"user_id": student_user["id"], "fields": "id"})
+        assert response.status_code == 403
+
+    def test_missing_record_still_404(self, client):
+        response = client.get("/users/999", params={"fields": "id"})
+        assert response.status_code == 404
+
+
+class TestCompiledProjections:
+    def test_projector_reused(self):
+        assert compile_projection(("id", "code")) is compile_projection(("id", "code"))
+
+    def test_projector_output(self):
+        record = {"id": 1, "title": "T", "code": "C"}
+        assert compile_projection(("id", "code"))(record) == {"id": 1, "code": "C"}
+        assert compile_projection(("title",))(record) == {"title": "T"}
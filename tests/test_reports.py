@@ -0,0 +1,197 @@
+"""Tests for background report jobs."""
+
+import csv
+import io
+import os
+import time
+
+import pytest
+
+from app.reports.jobs import JobQueueFullError, ReportJobManager, ReportSpec, manager
+
+
+def _slow_render(delay: float) -> str:
+    time.sleep(delay)
+    return "row\n"
+
+
+def _failing_render() -> str:
+    raise RuntimeError("boom")
+
+
+def _crashing_render() -> str:
+    os._exit(1)
+
+
+def _slow_spec(delay: float = 0.5, chunks: int = 1):
+    """Spec factory for ``ReportJobManager.submit``."""
+    return lambda: ReportSpec(filename="slow.csv", header="h\n", render=_slow_render, chunks=[(delay,)] * chunks)
+
+
+def _wait(get_status, timeout: float = 30.0) -> str:
+    """Poll ``get_status()`` until the job finishes and return its final status."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = get_status()
+        if status in ("completed", "failed"):
+            return status
+        time.sleep(0.05)
+    raise AssertionError("report job did not finish in time")
+
+
+@pytest.fixture(autouse=True)
+def clean_jobs():
+    yield
+    manager.shutdown()
+
+
+@pytest.fixture
+def jobs():
+    local = ReportJobManager(max_workers=2, max_concurrent_jobs=2, max_pending_jobs=4, ttl_seconds=60)
+    yield local
+    local.shutdown()
+
+
+def _enroll(client, user_id, course_id):
+    return client.post("/enrollments/", json={"user_id": user_id, "course_id": course_id}).json()
+
+
+class TestReportEndpoints:
+    def test_roster_report(self, client, admin_user, student_user, sample_course):
+        _enroll(client, student_user["id"], sample_course["id"])
+        response = client.post(
+            "/reports/roster",
+            params={"user_id": admin_user["id"], "course_id": sample_course["id"]},
+        )
+        assert response.status_code == 202
+        job_id = response.json()["id"]
+
+        job_url = f"/reports/jobs/{job_id}"
+        assert _wait(lambda: client.get(job_url, params={"user_id": admin_user["id"]}).json()["status"]) == "completed"
+        job = client.get(job_url, params={"user_id": admin_user["id"]}).json()
+        assert job["progress"] == 1.0
+
+        result = client.get(f"/reports/jobs/{job_id}/result", params={"user_id": admin_user["id"]})
+        assert result.status_code == 200
+        assert result.headers["content-type"].startswith("text/csv")
+        rows = list(csv.reader(io.StringIO(result.text)))
+        assert rows[0] == ["enrollment_id", "student_id", "name", "email"]
+        assert rows[1][1:] == [str(student_user["id"]), "Student User", "student@example.com"]
+
+    def test_transcript_report(self, client, admin_user, student_user, sample_course):
+        _enroll(client, student_user["id"], sample_course["id"])
+        response = client.post(
+            "/reports/transcript",
+            params={"user_id": admin_user["id"], "student_id": student_user["id"]},
+        )
+        job_id = response.json()["id"]
+        _wait(lambda: client.get(f"/reports/jobs/{job_id}", params={"user_id": admin_user["id"]}).json()["status"])
+
+        result = client.get(f"/reports/jobs/{job_id}/result", params={"user_id": admin_user["id"]})
+        rows = list(csv.reader(io.StringIO(result.text)))
+        assert rows[1][1:] == [str(sample_course["id"]), "CS101", "Introduction to Python"]
+
+    def test_report_as_student_forbidden(self, client, student_user, sample_course):
+        response = client.post(
+            "/reports/roster",
+            params={"user_id": student_user["id"], "course_id": sample_course["id"]},
+        )
+        assert response.status_code == 403
+
+    def test_roster_requires_course(self, client, admin_user):
+        response = client.post("/reports/roster", params={"user_id": admin_user["id"]})
+        assert response.status_code == 422
+
+    def test_roster_unknown_course(self, client, admin_user):
+        response = client.post("/reports/roster", params={"user_id": admin_user["id"], "course_id": 999})
+        assert response.status_code == 404
+
+    def test_unknown_kind(self, client, admin_user):
+        response = client.post("/reports/grades", params={"user_id": admin_user["id"]})
+        assert response.status_code == 422
+
+    def test_unknown_job(self, client, admin_user):
+        response = client.get("/reports/jobs/nope", params={"user_id": admin_user["id"]})
+        assert response.status_code == 404
+
+
+class TestReportJobManager:
+    def test_duplicate_requests_coalesced(self, jobs):
+        first = jobs.submit("roster", (1,), _slow_spec())
+        second = jobs.submit("roster", (1,), _slow_spec())
+        other = jobs.submit("roster", (2,), _slow_spec())
+        assert first is second
+        assert other is not first
+
+    def test_duplicate_does_not_rebuild_snapshot(self, jobs):
+        builds = []
+
+        def build():
+            builds.append(1)
+            return _slow_spec()()
+
+        first = jobs.submit("roster", (1,), build)
+        assert jobs.submit("roster", (1,), build) is first
+        assert len(builds) == 1
+
+    def test_failed_build_releases_key(self, jobs):
+        def broken():
+            raise LookupError("gone")
+
+        with pytest.raises(LookupError):
+            jobs.submit("roster", (1,), broken)
+        assert jobs.submit("roster", (1,), _slow_spec(delay=0)).chunks_total == 1
+
+    def test_progress_counts_chunks(self, jobs):
+        job = jobs.submit("roster", (1,), _slow_spec(delay=0.05, chunks=4))
+        assert job.chunks_total == 4
+        assert _wait(lambda: job.status) == "completed"
+        assert job.chunks_done == 4
+        with open(job.path) as fh:
+            assert fh.read() == "h\n" + "row\n" * 4
+
+    def test_pending_jobs_bounded(self):
+        bounded = ReportJobManager(max_workers=1, max_concurrent_jobs=1, max_pending_jobs=1, ttl_seconds=60)
+        try:
+            bounded.submit("roster", (1,), _slow_spec())
+            with pytest.raises(JobQueueFullError):
+                bounded.submit("roster", (2,), _slow_spec())
+        finally:
+            bounded.shutdown()
+
+    def test_failed_job_reports_error(self, jobs):
+        job = jobs.submit("roster", (1,), lambda: ReportSpec("x.csv", "h\n", _failing_render, [()]))
+        assert _wait(lambda: job.status) == "failed"
+        assert "boom" in job.error
+
+    def test_pool_replaced_after_worker_crash(self, jobs):
+        crashed = jobs.submit("roster", (1,), lambda: ReportSpec("x.csv", "h\n", _crashing_render, [()]))
+        assert _wait(lambda: crashed.status) == "failed"
+        healthy = jobs.submit("roster", (2,), _slow_spec(delay=0))
+        assert _wait(lambda: healthy.status) == "completed"
+
+    def test_results_expire(self):
+        short = ReportJobManager(max_workers=1, max_concurrent_jobs=1, max_pending_jobs=4, ttl_seconds=0.1)
+        try:
+            job = short.submit("roster", (1,), _slow_spec(delay=0))
+            assert _wait(lambda: job.status) == "completed"
+            path = job.path
+            assert os.path.exists(path)
+            time.sleep(0.2)
+            assert short.get(job.id) is None
+            assert not os.path.exists(path)
+        finally:
+            short.shutdown()
+
+    def test_results_swept_without_api_calls(self):
+        short = ReportJobManager(max_workers=1, max_concurrent_jobs=1, max_pending_jobs=4, ttl_seconds=0.1)
+        try:
+            job = short.submit("roster", (1,), _slow_spec(delay=0))
+            assert _wait(lambda: job.status) == "completed"
+            path = job.path
+            deadline = time.time() + 5
+            while os.path.exists(path) and time.time() < deadline:
+                time.sleep(0.05)
+            assert not os.path.exists(path)
+        finally:
+            short.shutdown()
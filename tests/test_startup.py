@@ -0,0 +1,97 @@
+"""Tests for boot timing, warm-up and readiness."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import startup
+from app.data.store import courses, enrollments, users
+from app.main import app
+from benchmarks.bench_cold_start import cold_start
+
+
+@pytest.fixture(autouse=True)
+def not_ready():
+    startup.set_ready(False)
+    yield
+    startup.set_ready(False)
+
+
+class TestReadiness:
+    def test_not_ready_before_startup(self, client):
+        response = client.get("/health/ready")
+        assert response.status_code == 503
+        assert response.json() == {"status": "starting"}
+
+    def test_ready_after_startup(self):
+        with TestClient(app) as client:
+            assert client.get("/health/ready").json() == {"status": "ready"}
+        assert startup.ready is False
+
+    def test_startup_report(self):
+        with TestClient(app) as client:
+            report = client.get("/health/startup").json()
+        assert report["ready"] is True
+        assert {"import", "app", "warmup"} <= set(report["phases_ms"])
+
+
+class TestWarmUp:
+    def test_warm_up_leaves_store_untouched(self):
+        with TestClient(app):
+            pass
+        assert len(users) == len(courses) == len(enrollments) == 0
+
+    def test_warm_up_requests_succeed_or_fail_cleanly(self):
+        import asyncio
+
+        async def run():
+            return [
+                await startup.asgi_request(app, method, path, query, body, warmup=True)
+                for method, path, query, body in startup.WARMUP_REQUESTS
+            ]
+
+        assert all(status_code in (200, 404, 422) for status_code in asyncio.run(run()))
+
+    def test_warm_up_never_lists_collections(self, monkeypatch):
+        import asyncio
+
+        from app.data.shared import SharedTable
+        from app.data.tables import Table
+
+        def no_listing(table):
+            raise AssertionError("warm-up read a whole collection")
+
+        monkeypatch.setattr(Table, "snapshot", no_listing)
+        monkeypatch.setattr(SharedTable, "snapshot", no_listing)
+        asyncio.run(startup.warm_up(app))
+
+    def test_openapi_generated_lazily(self):
+        app.openapi_schema = None
+        with TestClient(app) as client:
+            assert app.openapi_schema is None
+            assert client.get("/openapi.json").status_code == 200
+        assert app.openapi_schema is not None
+
+
+class TestFirstRequestTimer:
+    def test_health_probes_not_timed(self):
+        timings = startup.timings
+        saved = dict(timings)
+        timings.pop("first_request", None)
+        timer = startup.FirstRequestTimer(app)
+        try:
+            with TestClient(timer) as client:
+                client.get("/health/ready")
+                client.get("/health/startup")
+                assert "first_request" not in timings
+                client.get("/courses/")
+                assert "first_request" in timings
+        finally:
+            timings.clear()
+            timings.update(saved)
+
+
+class TestColdStart:
+    def test_cold_start_within_budget(self):
+        timings = cold_start()
+        assert timings["ready"] < 5000
+        assert "first_request" in timings
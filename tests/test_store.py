@@ -0,0 +1,147 @@
+"""Tests for the sharded enrollment store."""
+
+import threading
+
+import pytest
+
+from app.data.shards import DuplicateEnrollmentError, ShardedEnrollmentStore
+from app.data.store import enrollments, reset_store
+from app.data.tables import Table
+
+
+class TestShardRouting:
+    def test_course_operations_use_one_shard(self):
+        store = ShardedEnrollmentStore(4)
+        record = store.add(user_id=1, course_id=6)
+        shard = store.shard_for_course(6)
+        assert store.shard_for_enrollment(record["id"]) is shard
+        assert record["id"] in shard.records
+        assert all(record["id"] not in s.records for s in store.shards if s is not shard)
+
+    def test_ids_unique_across_shards(self):
+        store = ShardedEnrollmentStore(4)
+        ids = [store.add(user_id=u, course_id=c)["id"] for u in range(1, 6) for c in range(1, 9)]
+        assert len(set(ids)) == len(ids)
+        assert all(store.get(i)["id"] == i for i in ids)
+
+    def test_duplicate_enrollment_rejected(self):
+        store = ShardedEnrollmentStore(4)
+        store.add(user_id=1, course_id=2)
+        with pytest.raises(DuplicateEnrollmentError):
+            store.add(user_id=1, course_id=2)
+
+    def test_remove_frees_pair(self):
+        store = ShardedEnrollmentStore(4)
+        record = store.add(user_id=1, course_id=2)
+        assert store.remove(record["id"]) == record
+        assert store.remove(record["id"]) is None
+        assert store.for_course(2) == []
+        store.add(user_id=1, course_id=2)
+
+    def test_get_unknown_id(self):
+        store = ShardedEnrollmentStore(4)
+        assert store.get(0) is None
+        assert store.get(999) is None
+        assert 999 not in store
+
+    def test_invalid_shard_count(self):
+        with pytest.raises(ValueError):
+            ShardedEnrollmentStore(0)
+
+
+class TestCrossShardReads:
+    def test_all_in_id_order(self):
+        store = ShardedEnrollmentStore(3)
+        for course_id in (5, 1, 3, 2, 4, 6):
+            store.add(user_id=1, course_id=course_id)
+            store.add(user_id=2, course_id=course_id)
+        ids = [e["id"] for e in store.all()]
+        assert ids == sorted(ids)
+        assert len(ids) == len(store) == 12
+
+    def test_for_student_in_id_order(self):
+        store = ShardedEnrollmentStore(3)
+        for course_id in range(1, 8):
+            store.add(user_id=7, course_id=course_id)
+        store.add(user_id=8, course_id=1)
+        result = store.for_student(7)
+        assert sorted(e["course_id"] for e in result) == list(range(1, 8))
+        assert [e["id"] for e in result] == sorted(e["id"] for e in result)
+
+    def test_reset_store_changes_shard_count(self):
+        original = enrollments.num_shards
+        try:
+            reset_store(num_shards=5)
+            assert enrollments.num_shards == 5
+            assert len(enrollments.shards) == 5
+        finally:
+            reset_store(num_shards=original)
+
+
+class TestConcurrentWrites:
+    def test_parallel_enrollments(self):
+        store = ShardedEnrollmentStore(8)
+        errors = []
+
+        def enroll(course_id):
+            try:
+                for user_id in range(1, 201):
+                    store.add(user_id=user_id, course_id=course_id)
+            except Exception as exc:  # pragma: no cover - surfaced by the assert below
+                errors.append(exc)
+
+        threads = [threading.Thread(target=enroll, args=(c,)) for c in range(1, 17)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert errors == []
+        records = store.all()
+        assert len(records) == 16 * 200
+        assert len({e["id"] for e in records}) == len(records)
+
+    def test_parallel_duplicates_only_one_wins(self):
+        store = ShardedEnrollmentStore(4)
+        wins = []
+
+        def enroll():
+            try:
+                wins.append(store.add(user_id=1, course_id=1))
+            except DuplicateEnrollmentError:
+                pass
+
+        threads = [threading.Thread(target=enroll) for _ in range(16)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(wins) == 1
+
+
+class TestVersions:
+    def test_table_version_counts_writes(self):
+        table = Table()
+        table[1] = {"id": 1}
+        table[1] = {"id": 1, "x": 2}
+        del table[1]
+        assert table.version == 3
+        table.clear()
+        assert table.version == 4
+
+    def test_store_version_increases_across_reset(self):
+        store = ShardedEnrollmentStore(4)
+        record = store.add(user_id=1, course_id=1)
+        before = store.version
+        store.remove(record["id"])
+        assert store.version > before
+        before = store.version
+        store.clear()
+        assert store.version > before
+
+    def test_course_version_tracks_its_shard(self):
+        store = ShardedEnrollmentStore(4)
+        course_1, other_shard = store.course_version(1), store.course_version(2)
+        store.add(user_id=1, course_id=1)
+        assert store.course_version(1) > course_1
+        assert store.course_version(2) == other_shard
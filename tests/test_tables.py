@@ -0,0 +1,218 @@
+"""Tests for versioned tables and snapshot reads under concurrent writes."""
+
+import gc
+import threading
+import weakref
+
+from app.data import tables
+from app.data.shards import ShardedEnrollmentStore
+from app.data.tables import Table
+
+
+class _Value:
+    """Weak-referenceable record so tests can observe when memory is reclaimed."""
+
+    def __init__(self, n):
+        self.n = n
+
+
+class TestSnapshots:
+    def test_snapshot_ignores_later_writes(self):
+        table = Table()
+        table[1] = "a"
+        table[2] = "b"
+        snap = table.snapshot()
+        table[3] = "c"
+        table[1] = "A"
+        del table[2]
+        assert list(snap.items()) == [(1, "a"), (2, "b")]
+        assert list(table.items()) == [(1, "A"), (3, "c")]
+
+    def test_update_keeps_position(self):
+        table = Table()
+        for key in range(1, 4):
+            table[key] = key
+        table[1] = 10
+        assert list(table.values()) == [10, 2, 3]
+
+    def test_reinsert_after_delete(self):
+        table = Table()
+        table[1] = "a"
+        snap = table.snapshot()
+        del table[1]
+        table[1] = "b"
+        assert list(snap.values()) == ["a"]
+        assert list(table.values()) == ["b"]
+        assert table[1] == "b"
+
+    def test_point_reads(self):
+        table = Table()
+        table[1] = "a"
+        assert 1 in table and 2 not in table
+        assert table.get(2, "x") == "x"
+        assert table.pop(1) == "a"
+        assert table.pop(1) is None
+        assert len(table) == 0
+
+    def test_snapshot_is_constant_time(self):
+        table = Table()
+        for key in range(10_000):
+            table[key] = key
+        snap = table.snapshot()
+        # The snapshot shares the live log; it does not copy it.
+        assert snap._log is table._log
+
+
+def _chain_length(row) -> int:
+    length, node = 0, row.head
+    while node is not None:
+        length, node = length + 1, node[2]
+    return length
+
+
+class TestCompaction:
+    def test_updates_without_snapshots_keep_one_version(self):
+        table = Table()
+        for n in range(500):
+            table[n % 10] = n
+        assert max(_chain_length(row) for row in table._log) == 1
+        assert list(table.values()) == list(range(490, 500))
+
+    def test_deletes_shrink_log(self):
+        table = Table()
+        for key in range(5000):
+            table[key] = key
+        for key in range(2000):
+            del table[key]
+        assert len(table) == 3000
+        assert len(table._log) < 3500
+        assert list(table.keys()) == list(range(2000, 5000))
+
+    def test_small_tables_compact(self):
+        table = Table()
+        for n in range(200):
+            table[n] = n
+            del table[n]
+        assert len(table._log) <= tables._COMPACT_MIN
+
+    def test_compaction_preserves_old_snapshot(self):
+        table = Table()
+        for key in range(2000):
+            table[key] = key
+        snap = table.snapshot()
+        for key in range(2000):
+            table[key] = -key
+        for key in range(1000):
+            del table[key]
+        assert list(snap.values()) == list(range(2000))
+        assert list(table.values()) == [-key for key in range(1000, 2000)]
+
+    def test_chains_trimmed_to_oldest_snapshot(self):
+        table = Table()
+        for key in range(10):
+            table[key] = 0
+        snap = table.snapshot()
+        for n in range(1, 101):
+            for key in range(10):
+                table[key] = n
+        # Every version since the snapshot is still retained for it.
+        assert list(snap.values()) == [0] * 10
+        del snap
+        for key in range(10):
+            table[key] = "x"
+        assert max(_chain_length(row) for row in table._log) == 1
+
+    def test_read_only_traffic_keeps_bookkeeping_bounded(self):
+        table = Table()
+        for key in range(10):
+            table[key] = key
+        for _ in range(10_000):
+            list(table.values())
+        held = table.snapshot()
+        assert len(table._released) == 0
+        assert table._readers == {held.version: 1}
+
+    def test_memory_reclaimed_when_snapshot_dropped(self):
+        table = Table()
+        values = [_Value(n) for n in range(2000)]
+        refs = [weakref.ref(v) for v in values]
+        for n, value in enumerate(values):
+            table[n] = value
+        del values, value
+        snap = table.snapshot()
+        for n in range(2000):
+            del table[n]
+        gc.collect()
+        assert all(ref() is not None for ref in refs)
+        del snap
+        # Dead rows are dropped by the writes that follow.
+        for n in range(tables._COMPACT_MIN * 2):
+            table["filler"] = n
+            del table["filler"]
+        gc.collect()
+        assert all(ref() is None for ref in refs)
+
+
+class TestConcurrentListings:
+    def test_table_listing_during_writes(self):
+        """A writer sweeps keys 0..99 setting them to generation g; a snapshot
+        must see a prefix at g and a suffix at g - 1, never a torn mix."""
+        table = Table()
+        for key in range(100):
+            table[key] = 0
+        stop = threading.Event()
+        errors = []
+
+        def writer():
+            generation = 0
+            while not stop.is_set():
+                generation += 1
+                for key in range(100):
+                    table[key] = generation
+
+        def reader():
+            try:
+                for _ in range(300):
+                    values = list(table.values())
+                    assert len(values) == 100
+                    assert values == sorted(values, reverse=True)
+                    assert values[0] - values[-1] <= 1
+            except Exception as exc:
+                errors.append(exc)
+
+        threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads[1:]:
+            t.join()
+        stop.set()
+        threads[0].join()
+        assert errors == []
+
+    def test_enrollment_listing_during_writes(self):
+        store = ShardedEnrollmentStore(4)
+        errors = []
+
+        def writer(course_id):
+            try:
+                for user_id in range(1, 3001):
+                    record = store.add(user_id=user_id, course_id=course_id)
+                    if user_id % 3 == 0:
+                        store.remove(record["id"])
+            except Exception as exc:
+                errors.append(exc)
+
+        writers = [threading.Thread(target=writer, args=(c,)) for c in range(1, 9)]
+        for t in writers:
+            t.start()
+        listings = 0
+        while any(t.is_alive() for t in writers) or listings < 10:
+            listing = store.all()
+            ids = [e["id"] for e in listing]
+            assert ids == sorted(set(ids))
+            assert all(e["course_id"] == 3 for e in store.for_course(3))
+            listings += 1
+        for t in writers:
+            t.join()
+        assert errors == []
+        assert len(store.all()) == len(store) == 8 * 2000
@@ -0,0 +1,147 @@
+"""Tests for traffic capture and replay."""
+
+import asyncio
+import gzip
+import json
+import multiprocessing
+import time
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.traffic import TraceWriter, TrafficCaptureMiddleware, read_traces, sanitize
+from benchmarks.replay import build_request, replay, summarize
+
+
+@pytest.fixture
+def capture(tmp_path):
+    """A client whose requests are recorded; yields (client, trace path)."""
+    path = str(tmp_path / "traces.jsonl")
+    writer = TraceWriter(path)
+    client = TestClient(TrafficCaptureMiddleware(app, writer=writer))
+    yield client, path
+    writer.close()
+
+
+def _traces(path, client):
+    client.app.writer.close()
+    return list(read_traces(path))
+
+
+class TestCapture:
+    def test_records_route_template_and_params(self, capture, admin_user):
+        client, path = capture
+        client.get(f"/users/{admin_user['id']}", params={"fields": "id"})
+        (trace,) = _traces(path, client)
+        assert trace["m"] == "GET"
+        assert trace["r"] == "/users/{user_id}"
+        assert trace["p"] == {"user_id": str(admin_user["id"])}
+        assert trace["q"] == [["fields", "id"]]
+        assert trace["s"] == 200
+        assert trace["d"] >= 0
+
+    def test_body_is_sanitized(self, capture):
+        client, path = capture
+        client.post("/users/", json={"name": "Alice", "email": "alice@example.com", "role": "student"})
+        (trace,) = _traces(path, client)
+        assert trace["r"] == "/users/"
+        assert trace["s"] == 201
+        assert trace["b"]["role"] == "student"
+        assert "Alice" not in str(trace["b"]) and "alice@" not in str(trace["b"])
+
+    def test_sanitize_is_deterministic_and_valid(self):
+        first = sanitize({"email": "a@b.com", "nested": [{"name": "Bob"}]})
+        assert first == sanitize({"email": "a@b.com", "nested": [{"name": "Bob"}]})
+        assert first["email"].endswith("@example.com")
+
+    def test_health_probes_not_recorded(self, capture):
+        client, path = capture
+        client.get("/health/ready")
+        client.get("/courses/")
+        assert [trace["r"] for trace in _traces(path, client)] == ["/courses/"]
+
+    def test_unmatched_route_records_path(self, capture):
+        client, path = capture
+        client.get("/missing")
+        (trace,) = _traces(path, client)
+        assert trace["r"] == "/missing"
+        assert trace["s"] == 404
+
+
+def _append_traces(path: str, worker: int, count: int):
+    writer = TraceWriter(path)
+    for n in range(count):
+        writer.write({"w": worker, "n": n, "b": "x" * 2000})
+    writer.close()
+
+
+class TestTraceFile:
+    def test_processes_append_whole_lines(self, tmp_path):
+        path = str(tmp_path / "traces.jsonl")
+        ctx = multiprocessing.get_context("spawn")
+        workers = [ctx.Process(target=_append_traces, args=(path, w, 300)) for w in range(4)]
+        for p in workers:
+            p.start()
+        for p in workers:
+            p.join()
+        traces = list(read_traces(path))
+        assert len(traces) == 4 * 300
+        for w in range(4):
+            assert [t["n"] for t in traces if t["w"] == w] == list(range(300))
+
+    def test_flushes_on_interval(self, tmp_path):
+        path = str(tmp_path / "traces.jsonl")
+        writer = TraceWriter(path, flush_interval=0.05)
+        try:
+            writer.write({"n": 1})
+            deadline = time.time() + 5
+            while not list(read_traces(path)) and time.time() < deadline:
+                time.sleep(0.02)
+            assert list(read_traces(path)) == [{"n": 1}]
+        finally:
+            writer.close()
+
+    def test_truncated_tail_ignored(self, tmp_path):
+        path = tmp_path / "traces.jsonl"
+        path.write_text('{"n":1}\n{"n":2}\n{"n":')
+        assert list(read_traces(str(path))) == [{"n": 1}, {"n": 2}]
+
+    def test_reads_truncated_gzip(self, tmp_path):
+        path = tmp_path / "traces.jsonl.gz"
+        data = gzip.compress("".join(json.dumps({"n": n}) + "\n" for n in range(1000)).encode())
+        path.write_bytes(data[: len(data) // 2])
+        traces = list(read_traces(str(path)))
+        assert traces == [{"n": n} for n in range(len(traces))]
+
+
+class TestReplay:
+    def test_build_request(self):
+        trace = {
+            "m": "GET",
+            "r": "/enrollments/course/{course_id}",
+            "p": {"course_id": "4"},
+            "q": [["user_id", "1"]],
+        }
+        assert build_request(trace) == ("GET", "/enrollments/course/4", [["user_id", "1"]], None)
+
+    def test_capture_then_replay(self, capture):
+        client, path = capture
+        admin = client.post("/users/", json={"name": "A", "email": "a@example.com", "role": "admin"}).json()
+        client.post("/courses/", json={"title": "T", "code": "C1"}, params={"user_id": admin["id"]})
+        for _ in range(3):
+            client.get("/courses/")
+        traces = _traces(path, client)
+
+        async def run(**kwargs):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://replay") as http:
+                return await replay(traces, http, **kwargs)
+
+        for kwargs in ({"speed": 100.0}, {"concurrency": 2}):
+            rows = {row["route"]: row for row in summarize(asyncio.run(run(**kwargs)))}
+            assert rows["GET /courses/"]["count"] == 3
+            assert rows["POST /users/"]["count"] == 1
+            assert all(row["errors"] == 0 for row in rows.values())
+            assert rows["GET /courses/"]["p99"] >= rows["GET /courses/"]["p50"]
@@ -0,0 +1,289 @@
+"""Multi-process tests for the shared (STORE_PATH) store."""
+
+import os
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+WORKERS = 3
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_ready(url: str, proc: subprocess.Popen, timeout: float = 30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"worker exited with {proc.returncode}")
+        try:
+            if httpx.get(f"{url}/health/ready").status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"worker at {url} did not become ready")
+
+
+@pytest.fixture(scope="module")
+def workers(tmp_path_factory):
+    """Start separate uvicorn processes sharing one store file; yields their base URLs."""
+    env = dict(os.environ, STORE_PATH=str(tmp_path_factory.mktemp("shared") / "store.db"))
+    urls, procs = [], []
+    try:
+        for _ in range(WORKERS):
+            port = _free_port()
+            procs.append(subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+                env=env,
+            ))
+            urls.append(f"http://127.0.0.1:{port}")
+        for url, proc in zip(urls, procs):
+            _wait_ready(url, proc)
+        yield urls
+    finally:
+        for proc in procs:
+            proc.terminate()
+        for proc in procs:
+            proc.wait(timeout=10)
+
+
+def _post(url, path, **kwargs):
+    return httpx.post(f"{url}{path}", **kwargs)
+
+
+class TestSharedWorkers:
+    def test_ids_unique_and_data_identical(self, workers):
+        admin = _post(workers[0], "/users/", json={"name": "Admin", "email": "a@example.com", "role": "admin"}).json()
+
+        def create(n):
+            url = workers[n % WORKERS]
+            user = _post(url, "/users/", json={"name": f"S{n}", "email": f"s{n}@example.com", "role": "student"})
+            course = _post(
+                url, "/courses/", json={"title": f"Course {n}", "code": f"W{n:03d}"}, params={"user_id": admin["id"]}
+            )
+            return user.json()["id"], course.json()["id"]
+
+        with ThreadPoolExecutor(max_workers=12) as pool:
+            created = list(pool.map(create, range(60)))
+        user_ids = [u for u, _ in created]
+        course_ids = [c for _, c in created]
+        assert len(set(user_ids)) == len(user_ids) == 60
+        assert len(set(course_ids)) == len(course_ids) == 60
+
+        def enroll(n):
+            student_id, _ = created[n]
+            _, course_id = created[(n * 7) % 60]
+            url = workers[(n + 1) % WORKERS]
+            return _post(url, "/enrollments/", json={"user_id": student_id, "course_id": course_id}).json()["id"]
+
+        with ThreadPoolExecutor(max_workers=12) as pool:
+            enrollment_ids = list(pool.map(enroll, range(60)))
+        assert len(set(enrollment_ids)) == 60
+
+        listings = [
+            (
+                httpx.get(f"{url}/users/").json(),
+                httpx.get(f"{url}/courses/").json(),
+                httpx.get(f"{url}/enrollments/", params={"user_id": admin["id"]}).json(),
+            )
+            for url in workers
+        ]
+        assert all(listing == listings[0] for listing in listings)
+        assert {u["id"] for u in listings[0][0]} >= set(user_ids)
+        assert {e["id"] for e in listings[0][2]} == set(enrollment_ids)
+
+    def test_duplicate_enrollment_across_workers(self, workers):
+        admin = _post(workers[0], "/users/", json={"name": "Admin", "email": "b@example.com", "role": "admin"}).json()
+        student = _post(workers[1], "/users/", json={"name": "S", "email": "c@example.com", "role": "student"}).json()
+        course = _post(
+            workers[2], "/courses/", json={"title": "Dup", "code": "DUP1"}, params={"user_id": admin["id"]}
+        ).json()
+
+        def enroll(n):
+            body = {"user_id": student["id"], "course_id": course["id"]}
+            return _post(workers[n % WORKERS], "/enrollments/", json=body).status_code
+
+        with ThreadPoolExecutor(max_workers=9) as pool:
+            codes = list(pool.map(enroll, range(9)))
+        assert codes.count(201) == 1
+        assert codes.count(400) == 8
+
+    def test_update_visible_everywhere(self, workers):
+        admin = _post(workers[0], "/users/", json={"name": "Admin", "email": "d@example.com", "role": "admin"}).json()
+        course = _post(
+            workers[0], "/courses/", json={"title": "Old", "code": "UPD1"}, params={"user_id": admin["id"]}
+        ).json()
+        httpx.put(f"{workers[1]}/courses/{course['id']}", json={"title": "New"}, params={"user_id": admin["id"]})
+        assert all(httpx.get(f"{url}/courses/{course['id']}").json()["title"] == "New" for url in workers)
+
+    def test_report_job_visible_from_every_worker(self, workers):
+        admin = _post(workers[0], "/users/", json={"name": "Admin", "email": "e@example.com", "role": "admin"}).json()
+        student = _post(workers[1], "/users/", json={"name": "S", "email": "f@example.com", "role": "student"}).json()
+        course = _post(
+            workers[2], "/courses/", json={"title": "Rep", "code": "REP1"}, params={"user_id": admin["id"]}
+        ).json()
+        _post(workers[0], "/enrollments/", json={"user_id": student["id"], "course_id": course["id"]})
+        params = {"user_id": admin["id"]}
+
+        job = _post(workers[0], "/reports/roster", params={**params, "course_id": course["id"]}).json()
+        status_url = f"{workers[1]}/reports/jobs/{job['id']}"
+        deadline = time.time() + 60
+        while httpx.get(status_url, params=params).json()["status"] not in ("completed", "failed"):
+            assert time.time() < deadline, "report job did not finish in time"
+            time.sleep(0.1)
+        assert httpx.get(status_url, params=params).json()["status"] == "completed"
+
+        result = httpx.get(f"{workers[2]}/reports/jobs/{job['id']}/result", params=params)
+        assert result.status_code == 200
+        assert "f@example.com" in result.text
+
+
+class TestSharedStore:
+    @pytest.fixture
+    def db(self, tmp_path):
+        from app.data.shared import SharedDatabase
+
+        return SharedDatabase(str(tmp_path / "store.db"))
+
+    def test_table_versions_and_snapshot(self, db):
+        from app.data.shared import SharedTable
+
+        table = SharedTable(db, "courses")
+        table[1] = {"id": 1, "code": "A"}
+        table[2] = {"id": 2, "code": "B"}
+        table[1] = {"id": 1, "code": "A2"}
+        assert table.version == 3
+        assert list(table.values()) == [{"id": 1, "code": "A2"}, {"id": 2, "code": "B"}]
+        assert table.pop(2) == {"id": 2, "code": "B"}
+        assert table.pop(2) is None
+        assert 2 not in table and len(table) == 1
+
+    def test_get_many_and_read_transaction(self, db):
+        from app.data.shared import SharedDatabase, SharedTable
+
+        table = SharedTable(db, "users")
+        for key in range(1, 2001):
+            table[key] = {"id": key}
+        assert table.get_many([2, 5, 9999]) == {2: {"id": 2}, 5: {"id": 5}}
+        assert len(table.get_many(range(1, 2001))) == 2000
+
+        writer = SharedTable(SharedDatabase(db.path), "users")
+        with db.read():
+            before = table.get_many([1])
+            writer[1] = {"id": 1, "changed": True}
+            assert table.get_many([1]) == before
+        assert table[1] == {"id": 1, "changed": True}
+
+    def test_enrollments(self, db):
+        from app.data.shards import DuplicateEnrollmentError
+        from app.data.shared import SharedEnrollmentStore
+
+        store = SharedEnrollmentStore(db)
+        first = store.add(user_id=1, course_id=1)
+        second = store.add(user_id=2, course_id=1)
+        with pytest.raises(DuplicateEnrollmentError):
+            store.add(user_id=1, course_id=1)
+        assert store.for_course(1) == [first, second]
+        assert store.for_student(2) == [second]
+        assert store.remove(first["id"]) == first
+        assert store.remove(first["id"]) is None
+        assert store.all() == [second]
+
+    def test_report_jobs_shared_between_managers(self, db, tmp_path):
+        from app.reports.jobs import SharedReportJobManager
+        from tests.test_reports import _slow_spec, _wait
+
+        result_dir = str(tmp_path / "reports")
+        first = SharedReportJobManager(db, result_dir, max_workers=1, max_concurrent_jobs=1, max_pending_jobs=4)
+        second = SharedReportJobManager(db, result_dir, max_workers=1, max_concurrent_jobs=1, max_pending_jobs=4)
+        try:
+            job = first.submit("roster", (1,), _slow_spec(delay=0.5))
+            assert second.submit("roster", (1,), lambda: pytest.fail("duplicate was rebuilt")).id == job.id
+            assert _wait(lambda: second.get(job.id).status) == "completed"
+            finished = second.get(job.id)
+            assert finished.key == ("roster", 1)
+            assert finished.chunks_done == finished.chunks_total == 1
+            with open(finished.path) as fh:
+                assert fh.read().startswith("h\n")
+        finally:
+            first.shutdown()
+            second.shutdown()
+
+    def test_shutdown_fails_unfinished_shared_jobs(self, db, tmp_path):
+        from app.reports.jobs import SharedReportJobManager
+        from tests.test_reports import _slow_spec
+
+        result_dir = str(tmp_path / "reports")
+        owner = SharedReportJobManager(db, result_dir, max_workers=1, max_concurrent_jobs=1, max_pending_jobs=4)
+        other = SharedReportJobManager(db, result_dir, max_workers=1, max_concurrent_jobs=1, max_pending_jobs=4)
+        try:
+            running = owner.submit("roster", (1,), _slow_spec(delay=1.0))
+            queued = owner.submit("roster", (2,), _slow_spec(delay=0))
+            owner.shutdown()
+            assert other.get(running.id).status == "completed"
+            assert other.get(queued.id).status == "failed"
+            assert other.submit("roster", (2,), _slow_spec(delay=0)).id != queued.id
+        finally:
+            other.shutdown()
+
+    def test_jobs_of_killed_worker_are_failed(self, db, tmp_path):
+        import json
+
+        from app.reports.jobs import SharedReportJobManager
+        from tests.test_reports import _slow_spec, _wait
+
+        # Rows left behind by a worker that was SIGKILLed: unfinished, no heartbeat for a long time.
+        stale = time.time() - 3600
+        with db.write() as conn:
+            for n in range(4):
+                conn.execute(
+                    "INSERT INTO report_jobs (id, kind, key, owner, status, created_at, updated_at) "
+                    "VALUES (?, 'roster', ?, 'dead', 'running', ?, ?)",
+                    (f"dead{n}", json.dumps(["roster", n]), stale, stale),
+                )
+        jobs = SharedReportJobManager(
+            db, str(tmp_path / "reports"), max_workers=1, max_concurrent_jobs=1, max_pending_jobs=4
+        )
+        try:
+            job = jobs.submit("roster", (0,), _slow_spec(delay=0))
+            assert job.id != "dead0"
+            assert _wait(lambda: jobs.get(job.id).status) == "completed"
+            dead = jobs.get("dead0")
+            assert dead.status == "failed" and "stopped responding" in dead.error
+        finally:
+            jobs.shutdown()
+
+    def test_heartbeat_keeps_long_jobs_alive(self, db, tmp_path):
+        from app.reports.jobs import SharedReportJobManager
+        from tests.test_reports import _slow_spec, _wait
+
+        result_dir = str(tmp_path / "reports")
+        kwargs = {"max_workers": 1, "max_concurrent_jobs": 1, "max_pending_jobs": 4, "heartbeat_seconds": 0.05}
+        owner = SharedReportJobManager(db, result_dir, **kwargs)
+        other = SharedReportJobManager(db, result_dir, **kwargs)
+        try:
+            job = owner.submit("roster", (1,), _slow_spec(delay=1.0))
+            time.sleep(0.6)
+            assert other.submit("roster", (1,), _slow_spec(delay=0)).id == job.id
+            assert _wait(lambda: other.get(job.id).status) == "completed"
+        finally:
+            owner.shutdown()
+            other.shutdown()
+
+    def test_ids_survive_reconnect(self, db):
+        from app.data.shared import SharedDatabase
+
+        assert db.next_id("users") == 1
+        other = SharedDatabase(db.path)
+        assert other.next_id("users") == 2
+        db.reset()
+        assert other.next_id("users") == 1